@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos endpoints da API, comparado com uma baseline versionada.
+
+Gera um banco SQLite temporário com o gerador de dados sintéticos (sempre os
+mesmos parâmetros e semente) e mede cada cenário pelo test client do Flask,
+no mesmo processo: latência (p50/p95/p99), consultas SQL por requisição e
+pico de memória alocada durante a requisição (tracemalloc). O resultado é
+gravado em JSON e comparado com benchmarks/baseline_endpoints.json; mais
+consultas que na baseline (um N+1, por exemplo), latência ou memória acima
+da tolerância encerram o script com código 1.
+
+Consultas e memória dependem apenas do código; a latência depende da máquina,
+então a baseline deve ser gerada (--atualizar-baseline) no mesmo ambiente em
+que a comparação roda, ou a latência ignorada com --sem-latencia.
+
+Uso: python benchmarks/endpoints.py [--repeticoes 20] [--saida arquivo.json]
+                                    [--atualizar-baseline] [--sem-latencia]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(RAIZ, 'benchmarks', 'baseline_endpoints.json')
+SAIDA = os.path.join(RAIZ, 'benchmarks', 'resultado_endpoints.json')
+
+# Conjunto de dados da baseline; mudar estes valores exige nova baseline
+DADOS = {
+    'secretarias': 300,
+    'projetos_por_secretaria': 30,
+    'anos': 3,
+    'materiais_por_mes': 60,
+    'recursos_por_mes': 10,
+    'semente': 42,
+    'referencia': '2025-06-30'
+}
+
+# Regressão: acima de base * (1 + tolerância) + folga
+TOLERANCIA_LATENCIA = 0.5
+FOLGA_LATENCIA_MS = 5
+TOLERANCIA_MEMORIA = 0.25
+FOLGA_MEMORIA_KB = 64
+
+
+def _preparar_ambiente(diretorio):
+    """Banco, cache e jobs em arquivos temporários; o cache de consultas fica
+    desligado (TTL 0) para que os relatórios sejam medidos sem acerto de cache"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}"
+    os.environ['CACHE_CONSULTAS_ARQUIVO'] = os.path.join(diretorio, 'cache_consultas.db')
+    os.environ['CACHE_CONSULTAS_TTL'] = '0'
+    os.environ['RELATORIO_JOBS_DIR'] = os.path.join(diretorio, 'relatorios')
+    # Estado do usuário em cache durante toda a execução: expirar no meio
+    # acrescentaria uma consulta a requisições aleatórias
+    os.environ['JWT_ESTADO_USUARIO_TTL'] = str(24 * 3600)
+    sys.path.insert(0, RAIZ)
+
+
+class ContadorConsultas:
+    """Conta as consultas executadas fora das threads dos jobs de relatório"""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not threading.current_thread().name.startswith('relatorio-job'):
+            self.total += 1
+
+
+def _contexto(app, cliente, cabecalhos):
+    """Ids usados pelos cenários e um job de relatório já concluído"""
+    from src.models.database import db
+    from src.models.secretaria import Secretaria
+    from src.models.projeto import Projeto
+    from src.models.recursos import ContaPaga
+
+    with app.app_context():
+        contexto = {
+            'secretaria_id': db.session.query(Secretaria.id).filter(Secretaria.ativa == True).order_by(Secretaria.id).limit(1).scalar(),
+            'projeto_id': db.session.query(Projeto.id).order_by(Projeto.id).limit(1).scalar(),
+            'conta': db.session.query(ContaPaga).order_by(ContaPaga.id).first().to_dict()
+        }
+
+    contexto['job_id'] = _concluir_job(cliente, cabecalhos)
+    return contexto
+
+
+def _concluir_job(cliente, cabecalhos):
+    """Agenda o relatório de secretarias e espera o resultado ficar pronto"""
+    job = cliente.post('/api/relatorios/jobs', headers=cabecalhos, json={'tipo': 'secretarias', 'parametros': {}}).get_json()['job']
+    while job['status'] not in ('concluido', 'erro'):
+        time.sleep(0.05)
+        job = cliente.get(f"/api/relatorios/jobs/{job['id']}", headers=cabecalhos).get_json()['job']
+    return job['id']
+
+
+def _cenarios(cliente, cabecalhos, contexto):
+    """Requisições medidas, por rota. `url`, `json` e `dados` podem depender da
+    repetição (i); `preparar(i)` cria, fora da medição, o que a requisição
+    consome, e `aquecer()` roda uma vez antes das medições do cenário."""
+    secretaria_id = contexto['secretaria_id']
+    projeto_id = contexto['projeto_id']
+    conta = contexto['conta']
+
+    def criar(caminho, corpo, chave):
+        resposta = cliente.post(caminho, headers=cabecalhos, json=corpo)
+        return resposta.get_json()[chave]['id']
+
+    projeto = {'titulo': 'Projeto de benchmark', 'secretaria_id': secretaria_id, 'status': 'execucao', 'progresso': 10}
+    secretaria = {'nome': 'Secretaria de Benchmark', 'responsavel': 'Benchmark'}
+    material = {'nome': 'Papel A4', 'quantidade': 5, 'data_entrada': '2025-06-01', 'valor_unitario': 25}
+    recurso = {'nome': 'Notebooks', 'descricao': 'Benchmark', 'quantidade': 2, 'data_chegada': '2025-06-01', 'valor': 9000}
+    conta_corpo = {chave: conta[chave] for chave in ('tipo_conta', 'mes_referencia', 'valor', 'data_pagamento')}
+    csv_contas = (
+        'tipo_conta;mes_referencia;valor;data_pagamento\n'
+        + ''.join(f'benchmark;2024-{mes:02d};1.000,00;2024-{mes:02d}-10\n' for mes in range(1, 13))
+    )
+
+    return [
+        # auth
+        {'rota': 'POST /api/auth/login', 'metodo': 'POST', 'url': '/api/auth/login',
+         'json': {'email': 'admin@secretaria.gov.br', 'senha': 'admin123'}},
+        {'rota': 'GET /api/auth/me', 'metodo': 'GET', 'url': '/api/auth/me'},
+        {'rota': 'GET /api/auth/usuarios', 'metodo': 'GET', 'url': '/api/auth/usuarios'},
+        {'rota': 'POST /api/auth/register', 'metodo': 'POST', 'url': '/api/auth/register',
+         'json': lambda i: {'nome': 'Benchmark', 'email': f'benchmark{i}@secretaria.gov.br',
+                            'senha': 'benchmark123', 'nivel_acesso': 'visualizador'}},
+        # secretarias
+        {'rota': 'GET /api/secretarias/', 'metodo': 'GET', 'url': '/api/secretarias/'},
+        {'rota': 'GET /api/secretarias/<id>', 'metodo': 'GET', 'url': f'/api/secretarias/{secretaria_id}'},
+        {'rota': 'POST /api/secretarias/', 'metodo': 'POST', 'url': '/api/secretarias/', 'json': secretaria},
+        {'rota': 'PUT /api/secretarias/<id>', 'metodo': 'PUT', 'url': f'/api/secretarias/{secretaria_id}',
+         'json': lambda i: {'telefone': f'(11) 3000-{i:04d}'}},
+        {'rota': 'DELETE /api/secretarias/<id>', 'metodo': 'DELETE',
+         'preparar': lambda i: f"/api/secretarias/{criar('/api/secretarias/', secretaria, 'secretaria')}"},
+        # projetos
+        {'rota': 'GET /api/projetos/', 'metodo': 'GET', 'url': '/api/projetos/'},
+        {'rota': 'GET /api/projetos/?secretaria_id&status', 'metodo': 'GET',
+         'url': f'/api/projetos/?secretaria_id={secretaria_id}&status=execucao'},
+        {'rota': 'GET /api/projetos/<id>', 'metodo': 'GET', 'url': f'/api/projetos/{projeto_id}'},
+        {'rota': 'GET /api/projetos/dashboard', 'metodo': 'GET', 'url': '/api/projetos/dashboard'},
+        {'rota': 'POST /api/projetos/', 'metodo': 'POST', 'url': '/api/projetos/', 'json': projeto},
+        {'rota': 'POST /api/projetos/lote', 'metodo': 'POST', 'url': '/api/projetos/lote', 'json': [projeto] * 50},
+        {'rota': 'PUT /api/projetos/<id>', 'metodo': 'PUT', 'url': f'/api/projetos/{projeto_id}',
+         'json': lambda i: {'progresso': 10 + i % 80}},
+        {'rota': 'DELETE /api/projetos/<id>', 'metodo': 'DELETE',
+         'preparar': lambda i: f"/api/projetos/{criar('/api/projetos/', projeto, 'projeto')}"},
+        # recursos
+        {'rota': 'GET /api/recursos/contas', 'metodo': 'GET', 'url': '/api/recursos/contas'},
+        {'rota': 'GET /api/recursos/contas?ano', 'metodo': 'GET', 'url': '/api/recursos/contas?ano=2024'},
+        {'rota': 'GET /api/recursos/materiais', 'metodo': 'GET', 'url': '/api/recursos/materiais'},
+        {'rota': 'GET /api/recursos/estrategicos', 'metodo': 'GET', 'url': '/api/recursos/estrategicos'},
+        {'rota': 'GET /api/recursos/dashboard', 'metodo': 'GET', 'url': '/api/recursos/dashboard'},
+        {'rota': 'POST /api/recursos/contas', 'metodo': 'POST', 'url': '/api/recursos/contas', 'json': conta_corpo},
+        {'rota': 'PUT /api/recursos/contas/<id>', 'metodo': 'PUT', 'url': f"/api/recursos/contas/{conta['id']}",
+         'json': {'valor': conta['valor']}},
+        {'rota': 'POST /api/recursos/contas/lote', 'metodo': 'POST', 'url': '/api/recursos/contas/lote',
+         'json': [{**conta_corpo, 'tipo_conta': f'benchmark{numero}'} for numero in range(50)]},
+        {'rota': 'POST /api/recursos/materiais', 'metodo': 'POST', 'url': '/api/recursos/materiais', 'json': material},
+        {'rota': 'POST /api/recursos/materiais/lote', 'metodo': 'POST', 'url': '/api/recursos/materiais/lote',
+         'json': [material] * 50},
+        {'rota': 'POST /api/recursos/estrategicos', 'metodo': 'POST', 'url': '/api/recursos/estrategicos', 'json': recurso},
+        {'rota': 'POST /api/recursos/estrategicos/lote', 'metodo': 'POST', 'url': '/api/recursos/estrategicos/lote',
+         'json': [recurso] * 50},
+        {'rota': 'POST /api/recursos/importar/<tabela>', 'metodo': 'POST', 'url': '/api/recursos/importar/contas',
+         'dados': csv_contas, 'tipo_conteudo': 'text/csv'},
+        # relatorios
+        {'rota': 'GET /api/relatorios/secretarias', 'metodo': 'GET', 'url': '/api/relatorios/secretarias'},
+        {'rota': 'GET /api/relatorios/secretarias?incluir_projetos', 'metodo': 'GET',
+         'url': '/api/relatorios/secretarias?incluir_projetos=true&periodo_inicio=2024-01-01&periodo_fim=2024-12-31'},
+        {'rota': 'GET /api/relatorios/governo', 'metodo': 'GET', 'url': '/api/relatorios/governo'},
+        {'rota': 'GET /api/relatorios/dashboard-geral', 'metodo': 'GET', 'url': '/api/relatorios/dashboard-geral'},
+        {'rota': 'GET /api/relatorios/<tabela>/export', 'metodo': 'GET', 'url': '/api/relatorios/projetos/export'},
+        # Com o resultado já gerado para a versão atual, o job nasce concluído
+        {'rota': 'POST /api/relatorios/jobs', 'metodo': 'POST', 'url': '/api/relatorios/jobs',
+         'json': {'tipo': 'secretarias', 'parametros': {}}, 'aquecer': lambda: _concluir_job(cliente, cabecalhos)},
+        {'rota': 'GET /api/relatorios/jobs/<job_id>', 'metodo': 'GET', 'url': f"/api/relatorios/jobs/{contexto['job_id']}"},
+        {'rota': 'GET /api/relatorios/jobs/<job_id>/resultado', 'metodo': 'GET',
+         'url': f"/api/relatorios/jobs/{contexto['job_id']}/resultado"},
+    ]
+
+
+def _valor(campo, i):
+    return campo(i) if callable(campo) else campo
+
+
+def _requisitar(cliente, cabecalhos, cenario, i):
+    url = cenario['preparar'](i) if 'preparar' in cenario else cenario['url']
+    argumentos = {'method': cenario['metodo'], 'headers': cabecalhos}
+    if 'json' in cenario:
+        argumentos['json'] = _valor(cenario['json'], i)
+    if 'dados' in cenario:
+        argumentos.update(data=_valor(cenario['dados'], i), content_type=cenario['tipo_conteudo'])
+
+    inicio = time.perf_counter()
+    resposta = cliente.open(url, **argumentos)
+    resposta.get_data()  # respostas em streaming são consumidas dentro da medição
+    return resposta.status_code, (time.perf_counter() - inicio) * 1000
+
+
+def _medir(cliente, cabecalhos, cenario, contador, repeticoes):
+    # Aquecimento: snapshots e caches de compilação do SQLAlchemy
+    if 'aquecer' in cenario:
+        cenario['aquecer']()
+    status, _ = _requisitar(cliente, cabecalhos, cenario, 0)
+
+    tempos = []
+    consultas = []
+    for i in range(1, repeticoes + 1):
+        antes = contador.total
+        status, tempo = _requisitar(cliente, cabecalhos, cenario, i)
+        tempos.append(tempo)
+        consultas.append(contador.total - antes)
+
+    # Memória em uma requisição à parte: o tracemalloc distorce a latência
+    tracemalloc.start()
+    alocado = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    _requisitar(cliente, cabecalhos, cenario, repeticoes + 1)
+    pico = tracemalloc.get_traced_memory()[1] - alocado
+    tracemalloc.stop()
+
+    percentis = statistics.quantiles(tempos, n=100, method='inclusive')
+    return {
+        'status': status,
+        'p50_ms': round(percentis[49], 2),
+        'p95_ms': round(percentis[94], 2),
+        'p99_ms': round(percentis[98], 2),
+        'media_ms': round(statistics.fmean(tempos), 2),
+        'consultas': max(consultas),
+        'memoria_pico_kb': round(pico / 1024, 1)
+    }
+
+
+def _rotas_sem_cenario(app, cenarios):
+    """Rotas dos blueprints medidos que não aparecem em nenhum cenário"""
+    blueprints = ('auth', 'secretarias', 'projetos', 'recursos', 'relatorios')
+    cobertas = {cenario['rota'].split('?')[0] for cenario in cenarios}
+    faltando = []
+    for regra in app.url_map.iter_rules():
+        if regra.endpoint.split('.')[0] not in blueprints:
+            continue
+        caminho = regra.rule.replace('<int:', '<').replace('<projeto_id>', '<id>') \
+            .replace('<secretaria_id>', '<id>').replace('<conta_id>', '<id>')
+        for metodo in sorted(regra.methods - {'HEAD', 'OPTIONS'}):
+            if f'{metodo} {caminho}' not in cobertas:
+                faltando.append(f'{metodo} {regra.rule}')
+    return faltando
+
+
+def executar(repeticoes):
+    with tempfile.TemporaryDirectory() as diretorio:
+        _preparar_ambiente(diretorio)
+
+        from flask_jwt_extended import create_access_token
+        from sqlalchemy import event
+        from src.main import app
+        from src.models.database import db
+        from src.models.usuario import Usuario
+        from src.services.gerador import gerar_dados
+        from src.services.permissoes import claims_usuario
+
+        with app.app_context():
+            gerar_dados(
+                **{chave: valor for chave, valor in DADOS.items() if chave != 'referencia'},
+                referencia=date.fromisoformat(DADOS['referencia']),
+                informar=lambda mensagem: None
+            )
+            admin = Usuario.query.filter_by(email='admin@secretaria.gov.br').first()
+            token = create_access_token(identity=str(admin.id), additional_claims=claims_usuario(admin))
+            engines = list(db.engines.values())
+
+        cabecalhos = {'Authorization': f'Bearer {token}'}
+        cliente = app.test_client()
+        cenarios = _cenarios(cliente, cabecalhos, _contexto(app, cliente, cabecalhos))
+
+        contador = ContadorConsultas()
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', contador)
+
+        rotas = {}
+        for cenario in cenarios:
+            rotas[cenario['rota']] = _medir(cliente, cabecalhos, cenario, contador, repeticoes)
+            print(_linha(cenario['rota'], rotas[cenario['rota']]))
+
+        return {'dados': DADOS, 'repeticoes': repeticoes, 'rotas': rotas}, _rotas_sem_cenario(app, cenarios)
+
+
+def _linha(rota, medida, marca=''):
+    return (
+        f"{rota:<52}{medida['status']:>7}{medida['p50_ms']:>10.1f}{medida['p95_ms']:>10.1f}"
+        f"{medida['consultas']:>10}{medida['memoria_pico_kb']:>12.1f} {marca}"
+    )
+
+
+def comparar(resultado, baseline, latencia=True):
+    """Lista de regressões do resultado em relação à baseline"""
+    regressoes = []
+    for rota, base in baseline['rotas'].items():
+        atual = resultado['rotas'].get(rota)
+        if atual is None:
+            regressoes.append(f'{rota}: cenário removido')
+            continue
+        if atual['status'] != base['status']:
+            regressoes.append(f"{rota}: status {base['status']} -> {atual['status']}")
+        if atual['consultas'] > base['consultas']:
+            regressoes.append(f"{rota}: {base['consultas']} -> {atual['consultas']} consultas por requisição")
+        if latencia and atual['p95_ms'] > base['p95_ms'] * (1 + TOLERANCIA_LATENCIA) + FOLGA_LATENCIA_MS:
+            regressoes.append(f"{rota}: p95 {base['p95_ms']:.1f} -> {atual['p95_ms']:.1f} ms")
+        if atual['memoria_pico_kb'] > base['memoria_pico_kb'] * (1 + TOLERANCIA_MEMORIA) + FOLGA_MEMORIA_KB:
+            regressoes.append(f"{rota}: memória {base['memoria_pico_kb']:.0f} -> {atual['memoria_pico_kb']:.0f} KB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=20, help='requisições medidas por cenário')
+    parser.add_argument('--saida', default=SAIDA, help='arquivo JSON com o resultado')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--atualizar-baseline', action='store_true', help='grava o resultado como nova baseline')
+    parser.add_argument('--sem-latencia', action='store_true', help='compara apenas consultas, status e memória')
+    argumentos = parser.parse_args()
+
+    print(f"📊 {argumentos.repeticoes} repetições por cenário\n")
+    print(f"{'rota':<52}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'consultas':>10}{'memória KB':>12}")
+    resultado, sem_cenario = executar(argumentos.repeticoes)
+
+    with open(argumentos.saida, 'w') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultado gravado em {argumentos.saida}")
+
+    if sem_cenario:
+        print('⚠️  Rotas sem cenário de benchmark: ' + ', '.join(sem_cenario))
+
+    if argumentos.atualizar_baseline:
+        with open(argumentos.baseline, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"📌 Baseline atualizada: {argumentos.baseline}")
+        return 0
+
+    with open(argumentos.baseline) as arquivo:
+        baseline = json.load(arquivo)
+    if baseline['dados'] != resultado['dados']:
+        print('❌ A baseline foi gerada com outro conjunto de dados; gere uma nova com --atualizar-baseline')
+        return 1
+
+    regressoes = comparar(resultado, baseline, latencia=not argumentos.sem_latencia)
+    novas = sorted(set(resultado['rotas']) - set(baseline['rotas']))
+    if novas:
+        print('ℹ️  Cenários fora da baseline: ' + ', '.join(novas))
+    if regressoes:
+        print(f'\n❌ {len(regressoes)} regressão(ões) em relação à baseline:')
+        for regressao in regressoes:
+            print(f'   • {regressao}')
+        return 1
+
+    print('\n✅ Nenhuma regressão em relação à baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
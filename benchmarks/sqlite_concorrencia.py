@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de leitura/escrita concorrente no SQLite, com e sem o perfil de produção.
+
+Cada rodada cria um banco temporário com os dados do populate_db.py e inicia
+vários processos (como os workers do gunicorn) que fazem GET /api/projetos/ e
+POST /api/recursos/contas pelo test client do Flask durante alguns segundos.
+
+Uso: python benchmarks/sqlite_concorrencia.py [--processos 4] [--duracao 5] [--escrita 0.3]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _ambiente(caminho_banco, perfil):
+    ambiente = dict(os.environ)
+    ambiente['DATABASE_URL'] = f'sqlite:///{caminho_banco}'
+    ambiente['SQLITE_PERFIL_PRODUCAO'] = '1' if perfil else '0'
+    return ambiente
+
+
+def _worker(argumentos):
+    indice, caminho_banco, perfil, duracao, proporcao_escrita = argumentos
+    os.environ.update(_ambiente(caminho_banco, perfil))
+    sys.path.insert(0, RAIZ)
+
+    from flask_jwt_extended import create_access_token
+    from src.main import app
+    from src.models.usuario import Usuario
+    from src.services.permissoes import claims_usuario
+
+    with app.app_context():
+        admin = Usuario.query.filter_by(email='admin@secretaria.gov.br').first()
+        token = create_access_token(identity=str(admin.id), additional_claims=claims_usuario(admin))
+    cabecalhos = {'Authorization': f'Bearer {token}'}
+
+    cliente = app.test_client()
+    sorteio = random.Random(indice)
+    resultado = {'leituras': 0, 'escritas': 0, 'bloqueios': 0, 'erros': 0}
+
+    fim = time.monotonic() + duracao
+    while time.monotonic() < fim:
+        if sorteio.random() < proporcao_escrita:
+            resposta = cliente.post('/api/recursos/contas', headers=cabecalhos, json={
+                'tipo_conta': 'benchmark',
+                'mes_referencia': '2025-01',
+                'valor': 10,
+                'data_pagamento': '2025-01-10'
+            })
+            chave = 'escritas'
+        else:
+            resposta = cliente.get('/api/projetos/?limit=50', headers=cabecalhos)
+            chave = 'leituras'
+
+        if resposta.status_code < 400:
+            resultado[chave] += 1
+        elif 'locked' in (resposta.get_json(silent=True) or {}).get('error', ''):
+            resultado['bloqueios'] += 1
+        else:
+            resultado['erros'] += 1
+
+    return resultado
+
+
+def rodada(perfil, processos, duracao, proporcao_escrita):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_banco = os.path.join(diretorio, 'benchmark.db')
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'populate_db.py')],
+            env=_ambiente(caminho_banco, perfil), cwd=RAIZ, check=True, stdout=subprocess.DEVNULL
+        )
+
+        contexto = multiprocessing.get_context('spawn')
+        with contexto.Pool(processos) as pool:
+            parciais = pool.map(_worker, [
+                (indice, caminho_banco, perfil, duracao, proporcao_escrita)
+                for indice in range(processos)
+            ])
+
+    total = {chave: sum(parcial[chave] for parcial in parciais) for chave in parciais[0]}
+    total['leituras_s'] = total['leituras'] / duracao
+    total['escritas_s'] = total['escritas'] / duracao
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processos', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=5)
+    parser.add_argument('--escrita', type=float, default=0.3, help='proporção de requisições de escrita')
+    argumentos = parser.parse_args()
+
+    print(f"📊 {argumentos.processos} processos, {argumentos.duracao:g}s por rodada, {argumentos.escrita:.0%} de escritas\n")
+    print(f"{'perfil':<10}{'leituras/s':>12}{'escritas/s':>12}{'bloqueios':>11}{'erros':>8}")
+    for perfil in (False, True):
+        total = rodada(perfil, argumentos.processos, argumentos.duracao, argumentos.escrita)
+        print(
+            f"{'produção' if perfil else 'padrão':<10}"
+            f"{total['leituras_s']:>12.1f}{total['escritas_s']:>12.1f}"
+            f"{total['bloqueios']:>11}{total['erros']:>8}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Configuração do gunicorn: gunicorn -c gunicorn.conf.py src.main:app
+
+Por padrão usa workers síncronos. Com GUNICORN_WORKER_CLASS=gevent (ou
+-k gevent) cada worker atende centenas de requisições concorrentes em
+greenlets, o que compensa quando o tempo é gasto esperando o banco
+(PostgreSQL). Com SQLite as consultas não cedem a vez e o modo gevent não
+traz ganho.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+if worker_class == 'gevent':
+    workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count())))
+else:
+    workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+
+
+def post_fork(server, worker):
+    # Classe efetiva do worker: vale tanto GUNICORN_WORKER_CLASS quanto -k na
+    # linha de comando. A aplicação é carregada depois do fork (sem
+    # preload_app), então as variáveis abaixo ainda valem para o pool.
+    if 'gevent' not in server.cfg.worker_class_str:
+        return
+
+    # Pool limitado e sem overflow: os greenlets esperam na fila do pool em
+    # vez de abrir uma conexão cada um (workers x DB_POOL_SIZE conexões no total).
+    # O pool também atende as seções paralelas do relatório de governo
+    # (até RELATORIO_SECOES_WORKERS conexões por worker)
+    os.environ.setdefault('DB_POOL_SIZE', '20')
+    os.environ.setdefault('DB_MAX_OVERFLOW', '0')
+    os.environ.setdefault('DB_POOL_TIMEOUT', '30')
+
+    from src.models.cooperativo import habilitar_psycopg_cooperativo
+    habilitar_psycopg_cooperativo()
@@ -0,0 +1,91 @@
+import click
+from src.models.database import db
+
+
+def registrar_comandos(app):
+    """Registra os comandos de manutenção no CLI do Flask (flask --app src.main ...)"""
+
+    @app.cli.command('reconciliar-contadores')
+    def reconciliar_contadores_comando():
+        """Recalcula os contadores de projetos das secretarias"""
+        from src.models.contadores import reconciliar_contadores
+        from src.services.snapshots import invalidar_snapshots
+
+        corrigidas = reconciliar_contadores()
+        if corrigidas:
+            invalidar_snapshots()
+        db.session.commit()
+        click.echo(f'Contadores verificados; {corrigidas} secretaria(s) corrigida(s).')
+
+    @app.cli.command('migrar')
+    def migrar_comando():
+        """Atualiza o banco para o esquema atual (colunas, dados e índices)"""
+        from src.models.migracoes import migrar, MigracaoBloqueada
+
+        try:
+            migrar(informar=click.echo)
+        except MigracaoBloqueada as e:
+            raise click.ClickException(str(e))
+        click.echo('Banco de dados atualizado.')
+
+    @app.cli.command('limpar-cache')
+    def limpar_cache_comando():
+        """Esvazia o cache de consultas compartilhado entre os workers"""
+        from src.services.cache_consultas import limpar_cache
+
+        limpar_cache()
+        click.echo('Cache de consultas esvaziado.')
+
+    @app.cli.command('importar-csv')
+    @click.argument('tabela', type=click.Choice(['contas', 'materiais']))
+    @click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--encoding', default='utf-8-sig', show_default=True)
+    def importar_csv_comando(tabela, arquivo, encoding):
+        """Importa contas ou materiais de um arquivo CSV, em blocos"""
+        from src.services.importacao import importar_csv
+
+        with open(arquivo, encoding=encoding, newline='') as texto:
+            try:
+                eventos = importar_csv(tabela, texto)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+
+            for evento in eventos:
+                if evento['tipo'] == 'erro':
+                    click.echo(f"Linha {evento['linha']}: {evento['erro']}", err=True)
+                else:
+                    click.echo(f"{evento['linhas']} linhas lidas, {evento['inseridos']} gravadas, {evento['erros']} com erro")
+
+    @app.cli.command('gerar-dados')
+    @click.option('--secretarias', default=50, show_default=True)
+    @click.option('--projetos-por-secretaria', default=40, show_default=True, help='Média; a distribuição tem cauda longa')
+    @click.option('--anos', default=5, show_default=True, help='Anos de histórico de contas, materiais e recursos')
+    @click.option('--materiais-por-mes', default=30, show_default=True)
+    @click.option('--recursos-por-mes', default=8, show_default=True)
+    @click.option('--semente', default=42, show_default=True)
+    @click.option('--referencia', type=click.DateTime(['%Y-%m-%d']), default='2025-06-30', show_default=True,
+                  help='Data final dos dados')
+    @click.option('--limpar', is_flag=True, help='Apaga e recria todas as tabelas antes de gerar')
+    def gerar_dados_comando(secretarias, projetos_por_secretaria, anos, materiais_por_mes,
+                            recursos_por_mes, semente, referencia, limpar):
+        """Gera dados sintéticos determinísticos em volume de produção"""
+        from src.services.gerador import gerar_dados
+
+        if limpar:
+            db.drop_all()
+            db.create_all()
+
+        try:
+            gerar_dados(
+                secretarias=secretarias,
+                projetos_por_secretaria=projetos_por_secretaria,
+                anos=anos,
+                materiais_por_mes=materiais_por_mes,
+                recursos_por_mes=recursos_por_mes,
+                semente=semente,
+                referencia=referencia.date(),
+                informar=click.echo
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo('Dados gerados.')
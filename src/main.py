@@ -21,19 +21,45 @@ database_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'databas
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f"sqlite:///{database_path}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Pool de conexões configurável por variáveis de ambiente (DB_POOL_*)
+from src.models.pool import opcoes_engine, configurar_pool, estatisticas_pools
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+
 # Inicializar extensões
-CORS(app, origins="*")  # Permitir CORS para todas as origens
+CORS(app, origins="*", expose_headers=['X-Escrita-Recente'])  # Permitir CORS para todas as origens
 jwt = JWTManager(app)
 
+# Réplica somente leitura opcional (DATABASE_REPLICA_URL)
+from src.models.replica import configurar_replica
+configurar_replica(app)
+
 # Importar e inicializar banco após configuração
 from src.models.database import db
 db.init_app(app)
 
+# Perfil de produção do SQLite: WAL, pragmas e escritas em fila (BEGIN IMMEDIATE)
+from src.models.perfil_sqlite import configurar_sqlite
+with app.app_context():
+    for engine in db.engines.values():
+        configurar_sqlite(engine)
+        configurar_pool(engine)
+
 # Importar todos os modelos
 from src.models.usuario import Usuario
 from src.models.secretaria import Secretaria
 from src.models.projeto import Projeto
 from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+from src.models.snapshot import DashboardSnapshot
+import src.models.contadores  # eventos que mantêm os contadores de secretarias
+import src.models.versoes_tabelas  # contadores de versão por tabela (ETag e caches)
+
+# Criar tabelas ausentes (ex.: dashboard_snapshots em bancos já existentes)
+with app.app_context():
+    db.create_all()
+
+# Tokens de usuários desativados ou com nível alterado deixam de valer
+from src.services.permissoes import token_revogado
+jwt.token_in_blocklist_loader(token_revogado)
 
 # Importar e registrar blueprints
 from src.routes.auth import auth_bp
@@ -48,11 +74,25 @@ app.register_blueprint(projetos_bp, url_prefix='/api/projetos')
 app.register_blueprint(recursos_bp, url_prefix='/api/recursos')
 app.register_blueprint(relatorios_bp, url_prefix='/api/relatorios')
 
+# Comandos de manutenção (flask --app src.main <comando>)
+from src.comandos import registrar_comandos
+registrar_comandos(app)
+
 # Rota de teste
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'ok', 'message': 'API funcionando!'})
 
+# Estatísticas do pool de conexões deste processo (para dimensionar o pool)
+from flask_jwt_extended import jwt_required
+from src.services.permissoes import somente_administrador
+
+@app.route('/api/health/pool', methods=['GET'])
+@jwt_required()
+@somente_administrador
+def pool_stats():
+    return jsonify({'pid': os.getpid(), 'pools': estatisticas_pools(db.engines)})
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
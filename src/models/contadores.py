@@ -0,0 +1,162 @@
+from decimal import Decimal
+from sqlalchemy import event, func, case, inspect, select, bindparam
+from src.models.database import db
+from src.models.secretaria import Secretaria
+from src.models.projeto import Projeto
+
+# Status de projeto -> coluna de contagem em secretarias
+CONTADORES_STATUS = {
+    'planejamento': 'projetos_planejamento',
+    'execucao': 'projetos_em_execucao',
+    'concluido': 'projetos_concluidos',
+    'atrasado': 'projetos_atrasados'
+}
+
+COLUNAS_CONTADORES = [
+    'total_projetos',
+    *CONTADORES_STATUS.values(),
+    'recursos_aplicados_total',
+    'recursos_pendentes_total',
+    'progresso_total'
+]
+
+
+def _decimal(valor):
+    return Decimal(str(valor)) if valor else Decimal('0')
+
+
+def _igual(a, b):
+    """Compara valores de contadores com precisão de centavos"""
+    return _decimal(a).quantize(Decimal('0.01')) == _decimal(b).quantize(Decimal('0.01'))
+
+
+def _contribuicao(valores, sinal):
+    """Variação nos contadores causada por um projeto com os valores dados"""
+    deltas = {
+        'total_projetos': sinal,
+        'recursos_aplicados_total': sinal * _decimal(valores['recursos_aplicados']),
+        'recursos_pendentes_total': sinal * _decimal(valores['recursos_pendentes']),
+        'progresso_total': sinal * (valores['progresso'] or 0)
+    }
+    coluna_status = CONTADORES_STATUS.get(valores['status'])
+    if coluna_status:
+        deltas[coluna_status] = sinal
+    return deltas
+
+
+def _valores(projeto, anteriores=False):
+    """Valores relevantes do projeto; com anteriores=True, os de antes do flush"""
+    estado = inspect(projeto)
+    valores = {}
+    for campo in ('secretaria_id', 'status', 'recursos_aplicados', 'recursos_pendentes', 'progresso'):
+        atual = getattr(projeto, campo)
+        if anteriores:
+            historico = estado.attrs[campo].history
+            if historico.deleted:
+                atual = historico.deleted[0]
+        valores[campo] = atual
+    return valores
+
+
+def _aplicar(connection, secretaria_id, deltas):
+    """Soma os deltas aos contadores da secretaria em um único UPDATE"""
+    tabela = Secretaria.__table__
+    mudancas = {tabela.c[coluna]: tabela.c[coluna] + delta for coluna, delta in deltas.items() if delta}
+    if secretaria_id and mudancas:
+        # updated_at preservado: contadores não são alterações da secretaria
+        mudancas[tabela.c.updated_at] = tabela.c.updated_at
+        connection.execute(tabela.update().where(tabela.c.id == secretaria_id).values(mudancas))
+
+
+def aplicar_inseridos(connection, projetos):
+    """Soma aos contadores os projetos inseridos em massa (sem eventos do ORM).
+
+    Aplica deltas, como os eventos, em vez de recalcular os totais: gravações
+    concorrentes nas mesmas secretarias não se sobrescrevem.
+    """
+    por_secretaria = {}
+    for valores in projetos:
+        deltas = por_secretaria.setdefault(valores['secretaria_id'], {})
+        for coluna, delta in _contribuicao(valores, 1).items():
+            deltas[coluna] = deltas.get(coluna, 0) + delta
+
+    for secretaria_id, deltas in sorted(por_secretaria.items()):
+        _aplicar(connection, secretaria_id, deltas)
+
+
+@event.listens_for(Projeto, 'after_insert')
+def _projeto_inserido(mapper, connection, projeto):
+    valores = _valores(projeto)
+    _aplicar(connection, valores['secretaria_id'], _contribuicao(valores, 1))
+
+
+@event.listens_for(Projeto, 'after_delete')
+def _projeto_excluido(mapper, connection, projeto):
+    valores = _valores(projeto, anteriores=True)
+    _aplicar(connection, valores['secretaria_id'], _contribuicao(valores, -1))
+
+
+@event.listens_for(Projeto, 'after_update')
+def _projeto_atualizado(mapper, connection, projeto):
+    anteriores = _valores(projeto, anteriores=True)
+    atuais = _valores(projeto)
+    if anteriores == atuais:
+        return
+
+    remover = _contribuicao(anteriores, -1)
+    adicionar = _contribuicao(atuais, 1)
+
+    if anteriores['secretaria_id'] == atuais['secretaria_id']:
+        for coluna, delta in remover.items():
+            adicionar[coluna] = adicionar.get(coluna, 0) + delta
+    else:
+        _aplicar(connection, anteriores['secretaria_id'], remover)
+
+    _aplicar(connection, atuais['secretaria_id'], adicionar)
+
+
+def _contar(condicao):
+    return func.sum(case((condicao, 1), else_=0))
+
+
+def reconciliar_contadores(secretaria_ids=None):
+    """Recalcula os contadores a partir de projetos e corrige divergências.
+
+    Usado após cargas em massa (que não passam pelos eventos do ORM) e para
+    reparar drift. Retorna quantas secretarias tinham valores divergentes.
+    """
+    esperado = select(
+        Secretaria.id,
+        func.count(Projeto.id).label('total_projetos'),
+        *[
+            _contar(Projeto.status == status).label(coluna)
+            for status, coluna in CONTADORES_STATUS.items()
+        ],
+        func.coalesce(func.sum(Projeto.recursos_aplicados), 0).label('recursos_aplicados_total'),
+        func.coalesce(func.sum(Projeto.recursos_pendentes), 0).label('recursos_pendentes_total'),
+        func.coalesce(func.sum(Projeto.progresso), 0).label('progresso_total'),
+        *[getattr(Secretaria, coluna).label(f'atual_{coluna}') for coluna in COLUNAS_CONTADORES]
+    ).outerjoin(Projeto, Projeto.secretaria_id == Secretaria.id).group_by(Secretaria.id)
+
+    if secretaria_ids is not None:
+        esperado = esperado.where(Secretaria.id.in_(list(secretaria_ids)))
+
+    correcoes = []
+    for linha in db.session.execute(esperado).mappings():
+        valores = {coluna: linha[coluna] or 0 for coluna in COLUNAS_CONTADORES}
+        if not all(_igual(valores[coluna], linha[f'atual_{coluna}']) for coluna in COLUNAS_CONTADORES):
+            correcoes.append({'b_id': linha['id'], **valores})
+
+    if correcoes:
+        tabela = Secretaria.__table__
+        db.session.execute(
+            tabela.update()
+            .where(tabela.c.id == bindparam('b_id'))
+            .values(
+                {coluna: bindparam(coluna) for coluna in COLUNAS_CONTADORES}
+            )
+            .values(updated_at=tabela.c.updated_at),
+            correcoes
+        )
+
+    return len(correcoes)
@@ -0,0 +1,26 @@
+import psycopg2
+from psycopg2 import extensions
+from gevent.socket import wait_read, wait_write
+
+
+def _esperar(conexao, timeout=None):
+    """Callback de espera do psycopg2: cede a vez aos outros greenlets durante o I/O"""
+    while True:
+        estado = conexao.poll()
+        if estado == extensions.POLL_OK:
+            break
+        elif estado == extensions.POLL_READ:
+            wait_read(conexao.fileno(), timeout=timeout)
+        elif estado == extensions.POLL_WRITE:
+            wait_write(conexao.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f'Estado de poll inesperado: {estado!r}')
+
+
+def habilitar_psycopg_cooperativo():
+    """Torna as consultas do psycopg2 cooperativas sob gevent.
+
+    Sem o callback, cada consulta bloqueia o processo inteiro (o driver é
+    código C e não passa pelo monkey patching do gevent).
+    """
+    extensions.set_wait_callback(_esperar)
@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from src.models.serializacao import serializador
+from src.models.replica import SessaoRoteada
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
 
 class BaseModel(db.Model):
     """Modelo base com campos comuns"""
@@ -10,4 +12,7 @@ class BaseModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
+    
+    def to_dict(self):
+        """Converte o objeto para dicionário (serializador compilado por modelo)"""
+        return serializador(type(self)).de_objeto(self)
@@ -0,0 +1,157 @@
+from datetime import datetime
+from sqlalchemy import inspect, select, bindparam, func, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from src.models.database import db
+
+
+class MigracaoBloqueada(RuntimeError):
+    """Os dados atuais impedem a migração; exige correção manual"""
+
+
+class MigracaoAplicada(db.Model):
+    """Migrações de dados já executadas neste banco"""
+    __tablename__ = 'schema_migracoes'
+
+    id = db.Column(db.String(100), primary_key=True)
+    aplicada_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def _reconciliar_contadores():
+    from src.models.contadores import reconciliar_contadores
+    from src.services.snapshots import invalidar_snapshots
+    if reconciliar_contadores():
+        invalidar_snapshots()
+
+
+def _preencher_data_referencia_contas():
+    """Preenche contas_pagas.data_referencia a partir de mes_referencia"""
+    from src.models.recursos import ContaPaga, primeiro_dia_mes
+
+    tabela = ContaPaga.__table__
+    pendentes = db.session.execute(
+        select(tabela.c.id, tabela.c.mes_referencia).where(tabela.c.data_referencia.is_(None))
+    ).all()
+
+    valores = []
+    for id, mes_referencia in pendentes:
+        try:
+            valores.append({'b_id': id, 'data_referencia': primeiro_dia_mes(mes_referencia)})
+        except ValueError:
+            pass  # mês fora do formato: fica sem data_referencia
+
+    if valores:
+        db.session.execute(
+            tabela.update()
+            .where(tabela.c.id == bindparam('b_id'))
+            .values(data_referencia=bindparam('data_referencia'))
+            .values(updated_at=tabela.c.updated_at),
+            valores
+        )
+
+
+def _verificar_contas_duplicadas():
+    """Confere se contas_pagas pode receber o índice único (tipo_conta, mes_referencia).
+
+    Contas repetidas não são apagadas automaticamente: a migração é
+    interrompida com a lista dos pares a corrigir. O índice antigo, não
+    único, sobre as mesmas colunas é removido.
+    """
+    from src.models.recursos import ContaPaga
+
+    tabela = ContaPaga.__table__
+    duplicadas = db.session.execute(
+        select(tabela.c.tipo_conta, tabela.c.mes_referencia, func.count())
+        .group_by(tabela.c.tipo_conta, tabela.c.mes_referencia)
+        .having(func.count() > 1)
+        .order_by(tabela.c.mes_referencia, tabela.c.tipo_conta)
+    ).all()
+
+    if duplicadas:
+        pares = ', '.join(f'{tipo} {mes} ({quantidade}x)' for tipo, mes, quantidade in duplicadas[:20])
+        restantes = f' e mais {len(duplicadas) - 20}' if len(duplicadas) > 20 else ''
+        raise MigracaoBloqueada(
+            f'Contas repetidas por tipo_conta e mes_referencia: {pares}{restantes}. '
+            'Remova ou una as repetições e execute a migração novamente.'
+        )
+
+    db.session.execute(text('DROP INDEX IF EXISTS ix_contas_tipo_mes'))
+
+
+# Migrações de dados, executadas uma única vez e na ordem da lista, depois
+# que as colunas novas já existem no banco
+MIGRACOES_DADOS = [
+    ('0001_contadores_secretarias', _reconciliar_contadores),
+    ('0002_data_referencia_contas', _preencher_data_referencia_contas),
+    ('0003_contas_unicas', _verificar_contas_duplicadas),
+]
+
+
+def _adicionar_colunas(engine, informar):
+    """ALTER TABLE ADD COLUMN para colunas dos modelos ausentes no banco.
+
+    Colunas NOT NULL precisam de server_default para serem adicionadas a
+    tabelas com dados.
+    """
+    inspetor = inspect(engine)
+    preparador = engine.dialect.identifier_preparer
+
+    for tabela in db.metadata.sorted_tables:
+        existentes = {coluna['name'] for coluna in inspetor.get_columns(tabela.name)}
+        for coluna in tabela.columns:
+            if coluna.name in existentes:
+                continue
+            definicao = CreateColumn(coluna).compile(dialect=engine.dialect)
+            with engine.begin() as conexao:
+                conexao.exec_driver_sql(f'ALTER TABLE {preparador.format_table(tabela)} ADD COLUMN {definicao}')
+            informar(f'Coluna adicionada: {tabela.name}.{coluna.name}')
+
+
+def _aplicar_migracoes_dados(informar):
+    aplicadas = {id for (id,) in db.session.query(MigracaoAplicada.id)}
+    for id, migrar in MIGRACOES_DADOS:
+        if id in aplicadas:
+            continue
+        migrar()
+        db.session.add(MigracaoAplicada(id=id))
+        db.session.commit()
+        informar(f'Migração de dados aplicada: {id}')
+
+
+def _criar_indices(engine, informar):
+    """Cria os índices declarados nos modelos que ainda não existem.
+
+    No PostgreSQL o índice é criado com CONCURRENTLY (fora de transação),
+    sem bloquear escritas na tabela durante a construção.
+    """
+    inspetor = inspect(engine)
+    postgresql = engine.dialect.name == 'postgresql'
+
+    for tabela in db.metadata.sorted_tables:
+        existentes = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+        for indice in sorted(tabela.indexes, key=lambda indice: indice.name):
+            if indice.name in existentes:
+                continue
+
+            sql = str(CreateIndex(indice, if_not_exists=True).compile(dialect=engine.dialect))
+            if postgresql:
+                sql = sql.replace('INDEX IF NOT EXISTS', 'INDEX CONCURRENTLY IF NOT EXISTS', 1)
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conexao:
+                    conexao.exec_driver_sql(sql)
+            else:
+                with engine.begin() as conexao:
+                    conexao.exec_driver_sql(sql)
+            informar(f'Índice criado: {indice.name}')
+
+
+def migrar(informar=print):
+    """Atualiza um banco existente para o esquema atual dos modelos.
+
+    Cria tabelas ausentes, adiciona colunas novas, executa as migrações de
+    dados pendentes e por fim cria os índices que faltam. Pode ser executada
+    mais de uma vez; passos já aplicados são ignorados.
+    """
+    engine = db.engine
+    db.create_all()
+    _adicionar_colunas(engine, informar)
+    _aplicar_migracoes_dados(informar)
+    _criar_indices(engine, informar)
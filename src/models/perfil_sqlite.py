@@ -0,0 +1,48 @@
+import os
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Perfil de produção para SQLite com vários workers (desligar com SQLITE_PERFIL_PRODUCAO=0)
+PERFIL_ATIVO = os.getenv('SQLITE_PERFIL_PRODUCAO', '1') == '1'
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', str(64 * 1024)))
+
+METODOS_ESCRITA = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def _conectado(dbapi_connection, connection_record):
+    # Transações passam a ser abertas pelo evento "begin" abaixo, e não pelo driver
+    dbapi_connection.isolation_level = None
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')  # leitores não bloqueiam o escritor
+    cursor.execute('PRAGMA synchronous=NORMAL')  # seguro em WAL, fsync só no checkpoint
+    cursor.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')  # espera o lock em vez de falhar
+    cursor.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    cursor.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KB}')
+    cursor.close()
+
+
+def _iniciar_transacao(connection):
+    """BEGIN IMMEDIATE em requisições de escrita.
+
+    Com BEGIN comum a transação lê antes de pedir o lock de escrita, e duas
+    escritas concorrentes terminam em "database is locked" sem esperar pelo
+    busy_timeout. Com IMMEDIATE o lock é pedido no início e as escritas
+    entram em fila.
+    """
+    if has_request_context() and request.method in METODOS_ESCRITA:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    else:
+        connection.exec_driver_sql('BEGIN')
+
+
+def configurar_sqlite(engine):
+    """Aplica o perfil de produção ao engine, se for SQLite em arquivo"""
+    if not PERFIL_ATIVO or engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return False
+
+    event.listen(engine, 'connect', _conectado)
+    event.listen(engine, 'begin', _iniciar_transacao)
+    return True
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+# Dimensionamento do pool por processo (workers x threads não deve passar
+# do max_connections do banco: pool_size + max_overflow por worker)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'
+# Tempo máximo por instrução no PostgreSQL (0 = sem limite)
+STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+
+
+class PoolInstrumentado(QueuePool):
+    """QueuePool que registra quantas conexões foram pedidas e quanto se esperou por elas"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trava_estatisticas = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            with self._trava_estatisticas:
+                self._timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._trava_estatisticas:
+                self._checkouts += 1
+                self._espera_total += espera
+                self._espera_maxima = max(self._espera_maxima, espera)
+
+    def estatisticas(self):
+        with self._trava_estatisticas:
+            return {
+                'tamanho': self.size(),
+                'max_overflow': self._max_overflow,
+                'em_uso': self.checkedout(),
+                'ociosas': self.checkedin(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'espera_media_ms': round(self._espera_total / self._checkouts * 1000, 3) if self._checkouts else 0,
+                'espera_maxima_ms': round(self._espera_maxima * 1000, 3)
+            }
+
+
+def opcoes_engine(url):
+    """SQLALCHEMY_ENGINE_OPTIONS a partir das variáveis de ambiente"""
+    if url.startswith('sqlite') and (':memory:' in url or url.rstrip('/') == 'sqlite:'):
+        return {}
+
+    return {
+        'poolclass': PoolInstrumentado,
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_recycle': POOL_RECYCLE,
+        'pool_pre_ping': POOL_PRE_PING
+    }
+
+
+def _limitar_instrucoes(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'SET statement_timeout = {STATEMENT_TIMEOUT_MS}')
+    cursor.close()
+    dbapi_connection.commit()
+
+
+def configurar_pool(engine):
+    """Aplica o statement_timeout às conexões PostgreSQL do engine"""
+    if STATEMENT_TIMEOUT_MS and engine.dialect.name == 'postgresql':
+        event.listen(engine, 'connect', _limitar_instrucoes)
+
+
+def estatisticas_pools(engines):
+    """Estatísticas atuais dos pools instrumentados, por bind"""
+    return {
+        nome or 'primario': engine.pool.estatisticas()
+        for nome, engine in engines.items()
+        if isinstance(engine.pool, PoolInstrumentado)
+    }
@@ -1,41 +1,47 @@
+from sqlalchemy import insert_sentinel
 from src.models.database import db, BaseModel
 from datetime import date
 
 class Projeto(BaseModel):
     __tablename__ = 'projetos'
+    __table_args__ = (
+        # Filtros de list_projetos e relatórios por secretaria/status
+        db.Index('ix_projetos_secretaria_status', 'secretaria_id', 'status'),
+        # Relatório de secretarias com período (data_inicio) agrupado por secretaria
+        db.Index('ix_projetos_secretaria_data_inicio', 'secretaria_id', 'data_inicio'),
+        # Alerta de projetos vencendo: status IN (...) AND data_previsao_termino <= limite
+        db.Index('ix_projetos_status_previsao', 'status', 'data_previsao_termino'),
+        # Alerta de recursos pendentes: apenas as linhas com pendência
+        db.Index(
+            'ix_projetos_recursos_pendentes', 'id',
+            sqlite_where=db.text('recursos_pendentes > 0'),
+            postgresql_where=db.text('recursos_pendentes > 0')
+        ),
+    )
     
     titulo = db.Column(db.String(200), nullable=False)
     descricao = db.Column(db.Text)
-    status = db.Column(db.String(20), nullable=False, default='planejamento')  # planejamento, execucao, concluido, atrasado
+    # Colunas somadas nos contadores de secretarias (src/models/contadores.py):
+    # active_history carrega o valor anterior mesmo com o atributo expirado
+    status = db.column_property(
+        db.Column(db.String(20), nullable=False, default='planejamento'), active_history=True
+    )  # planejamento, execucao, concluido, atrasado
     data_inicio = db.Column(db.Date)
     data_previsao_termino = db.Column(db.Date)
     data_termino_real = db.Column(db.Date)
-    progresso = db.Column(db.Integer, default=0)  # 0 a 100
-    recursos_aplicados = db.Column(db.Numeric(12, 2), default=0)
-    recursos_pendentes = db.Column(db.Numeric(12, 2), default=0)
+    progresso = db.column_property(db.Column(db.Integer, default=0), active_history=True)  # 0 a 100
+    recursos_aplicados = db.column_property(db.Column(db.Numeric(12, 2), default=0), active_history=True)
+    recursos_pendentes = db.column_property(db.Column(db.Numeric(12, 2), default=0), active_history=True)
     observacoes = db.Column(db.Text)
     
     # Chave estrangeira para secretaria
-    secretaria_id = db.Column(db.Integer, db.ForeignKey('secretarias.id'), nullable=False)
+    secretaria_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('secretarias.id'), nullable=False), active_history=True
+    )
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'titulo': self.titulo,
-            'descricao': self.descricao,
-            'status': self.status,
-            'data_inicio': self.data_inicio.isoformat() if self.data_inicio else None,
-            'data_previsao_termino': self.data_previsao_termino.isoformat() if self.data_previsao_termino else None,
-            'data_termino_real': self.data_termino_real.isoformat() if self.data_termino_real else None,
-            'progresso': self.progresso,
-            'recursos_aplicados': float(self.recursos_aplicados) if self.recursos_aplicados else 0,
-            'recursos_pendentes': float(self.recursos_pendentes) if self.recursos_pendentes else 0,
-            'observacoes': self.observacoes,
-            'secretaria_id': self.secretaria_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Ordena o RETURNING dos inserts em lote (ver MaterialEscritorio)
+    sentinela_lote = insert_sentinel('sentinela_lote')
+    campos_excluidos = ('sentinela_lote',)
     
     @property
     def dias_restantes(self):
@@ -1,32 +1,62 @@
+from sqlalchemy import insert_sentinel
+from sqlalchemy.orm import validates
 from src.models.database import db, BaseModel
 from datetime import date
 
+
+def primeiro_dia_mes(mes_referencia):
+    """Converte 'YYYY-MM' no primeiro dia do mês (data_referencia)"""
+    try:
+        ano, mes = mes_referencia.split('-')
+        return date(int(ano), int(mes), 1)
+    except (AttributeError, ValueError):
+        raise ValueError('mes_referencia deve estar no formato YYYY-MM')
+
+
+def intervalo_ano(ano):
+    """Predicado de intervalo sobre data_referencia para um ano inteiro"""
+    return db.and_(
+        ContaPaga.data_referencia >= date(ano, 1, 1),
+        ContaPaga.data_referencia < date(ano + 1, 1, 1)
+    )
+
 class ContaPaga(BaseModel):
     __tablename__ = 'contas_pagas'
+    __table_args__ = (
+        # Ordenação/paginação de list_contas e filtro por mês
+        db.Index('ix_contas_mes_referencia', 'mes_referencia', 'id'),
+        # Uma conta por tipo e mês: alvo do upsert (ON CONFLICT) e filtro por tipo
+        db.Index('uq_contas_tipo_mes', 'tipo_conta', 'mes_referencia', unique=True),
+        # Período do relatório de governo
+        db.Index('ix_contas_data_pagamento', 'data_pagamento'),
+        # Gastos por mês/ano agrupados por tipo: varredura só do índice
+        db.Index('ix_contas_data_referencia', 'data_referencia', 'tipo_conta', 'valor'),
+    )
     
     tipo_conta = db.Column(db.String(50), nullable=False)  # agua, luz, internet, etc
     mes_referencia = db.Column(db.String(7), nullable=False)  # formato YYYY-MM
+    data_referencia = db.Column(db.Date)  # primeiro dia de mes_referencia, para filtros por intervalo
     valor = db.Column(db.Numeric(10, 2), nullable=False)
     data_pagamento = db.Column(db.Date, nullable=False)
     arquivo_comprovante = db.Column(db.String(255))  # caminho para o arquivo PDF/scan
     observacoes = db.Column(db.Text)
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'tipo_conta': self.tipo_conta,
-            'mes_referencia': self.mes_referencia,
-            'valor': float(self.valor) if self.valor else 0,
-            'data_pagamento': self.data_pagamento.isoformat() if self.data_pagamento else None,
-            'arquivo_comprovante': self.arquivo_comprovante,
-            'observacoes': self.observacoes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Coluna derivada, mantida fora da resposta da API
+    campos_excluidos = ('data_referencia',)
+    # Chave natural: gravações com o mesmo tipo e mês atualizam a conta existente
+    chave_natural = ('tipo_conta', 'mes_referencia')
+    
+    @validates('mes_referencia')
+    def _sincronizar_data_referencia(self, chave, valor):
+        self.data_referencia = primeiro_dia_mes(valor)
+        return valor
 
 class MaterialEscritorio(BaseModel):
     __tablename__ = 'materiais_escritorio'
+    __table_args__ = (
+        # Paginação por (data_entrada, id), materiais recentes e período do relatório
+        db.Index('ix_materiais_data_entrada', 'data_entrada', 'id'),
+    )
     
     nome = db.Column(db.String(100), nullable=False)
     descricao = db.Column(db.Text)
@@ -36,24 +66,23 @@ class MaterialEscritorio(BaseModel):
     data_entrada = db.Column(db.Date, nullable=False)
     valor_unitario = db.Column(db.Numeric(10, 2))
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'descricao': self.descricao,
-            'quantidade': self.quantidade,
-            'unidade': self.unidade,
-            'fornecedor': self.fornecedor,
-            'data_entrada': self.data_entrada.isoformat() if self.data_entrada else None,
-            'valor_unitario': float(self.valor_unitario) if self.valor_unitario else 0,
-            'valor_total': float(self.valor_unitario * self.quantidade) if self.valor_unitario and self.quantidade else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Sentinela dos inserts em lote (src/services/lote.py): o RETURNING volta
+    # na ordem dos itens sem que o SQLite precise de um INSERT por linha
+    sentinela_lote = insert_sentinel('sentinela_lote')
+    campos_excluidos = ('sentinela_lote',)
+    
+    # Campos derivados incluídos na serialização
+    campos_calculados = {
+        'valor_total': lambda linha: float(linha['valor_unitario'] * linha['quantidade'])
+        if linha['valor_unitario'] and linha['quantidade'] else 0
+    }
 
 class RecursoEstrategico(BaseModel):
     __tablename__ = 'recursos_estrategicos'
+    __table_args__ = (
+        # Paginação por (data_chegada, id) e período do relatório
+        db.Index('ix_recursos_data_chegada', 'data_chegada', 'id'),
+    )
     
     nome = db.Column(db.String(100), nullable=False)
     descricao = db.Column(db.Text, nullable=False)
@@ -64,19 +93,6 @@ class RecursoEstrategico(BaseModel):
     valor = db.Column(db.Numeric(12, 2))
     status = db.Column(db.String(20), default='recebido')  # recebido, em_uso, finalizado
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'descricao': self.descricao,
-            'quantidade': self.quantidade,
-            'data_chegada': self.data_chegada.isoformat() if self.data_chegada else None,
-            'destino_uso': self.destino_uso,
-            'fornecedor': self.fornecedor,
-            'valor': float(self.valor) if self.valor else 0,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
-
+    # Ordena o RETURNING dos inserts em lote (ver MaterialEscritorio)
+    sentinela_lote = insert_sentinel('sentinela_lote')
+    campos_excluidos = ('sentinela_lote',)
@@ -0,0 +1,139 @@
+import math
+import os
+import time
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+# Banco réplica somente leitura (ex.: réplica de streaming do PostgreSQL)
+URL_REPLICA = os.getenv('DATABASE_REPLICA_URL')
+# Atraso máximo tolerado (segundos): acima disso, e logo após uma escrita do
+# mesmo cliente, as leituras vão para o primário
+ATRASO_MAXIMO = float(os.getenv('DATABASE_REPLICA_ATRASO_MAXIMO', '5'))
+# Por quanto tempo (segundos) a medição de atraso da réplica é reaproveitada
+INTERVALO_MEDICAO = 1.0
+
+METODOS_LEITURA = {'GET', 'HEAD'}
+
+# Marca de escrita recente devolvida ao cliente (cookie e cabeçalho assinados,
+# válidos por ATRASO_MAXIMO segundos); vale em qualquer worker ou processo
+COOKIE_ESCRITA = 'escrita_recente'
+CABECALHO_ESCRITA = 'X-Escrita-Recente'
+
+_atraso_medido = {'em': 0.0, 'valor': None}
+
+
+def configurar_replica(app):
+    """Registra o bind 'replica' quando DATABASE_REPLICA_URL está definida"""
+    if URL_REPLICA:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})['replica'] = URL_REPLICA
+        app.after_request(_marcar_escrita)
+
+
+def leituras_na_replica():
+    """Permite leituras na réplica fora de requisições GET (ex.: jobs de relatório)"""
+    g.leituras_na_replica = True
+
+
+def _atraso_replica(engine):
+    """Atraso de replicação em segundos (0 fora do PostgreSQL; None se indisponível)"""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+
+    agora = time.monotonic()
+    if agora - _atraso_medido['em'] < INTERVALO_MEDICAO:
+        return _atraso_medido['valor']
+
+    try:
+        with engine.connect() as conexao:
+            # Réplica sem WAL pendente está em dia, mesmo que a última transação seja antiga
+            atraso = conexao.execute(text(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+            )).scalar()
+        valor = float(atraso) if atraso is not None else 0.0
+    except Exception:
+        valor = None
+
+    _atraso_medido.update(em=agora, valor=valor)
+    return valor
+
+
+def _usuario_atual():
+    try:
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _assinador():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='replica-escrita')
+
+
+def _marcar_escrita(resposta):
+    """Envia a marca de escrita recente nas respostas de requisições que escreveram"""
+    if g.get('escreveu_no_primario'):
+        marca = _assinador().dumps(str(_usuario_atual()))
+        resposta.set_cookie(COOKIE_ESCRITA, marca, max_age=math.ceil(ATRASO_MAXIMO),
+                            httponly=True, samesite='Lax')
+        resposta.headers[CABECALHO_ESCRITA] = marca
+    return resposta
+
+
+def escrita_recente():
+    """Se o cliente da requisição escreveu há menos de ATRASO_MAXIMO segundos
+
+    O cliente devolve a marca no cookie ou no cabeçalho X-Escrita-Recente;
+    marcas de outro usuário, expiradas ou adulteradas são ignoradas.
+    """
+    if 'escrita_recente' not in g:
+        marca = request.headers.get(CABECALHO_ESCRITA) or request.cookies.get(COOKIE_ESCRITA)
+        valida = False
+        if marca:
+            try:
+                valida = _assinador().loads(marca, max_age=ATRASO_MAXIMO) == str(_usuario_atual())
+            except BadSignature:
+                pass
+        g.escrita_recente = valida
+    return g.escrita_recente
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia leituras para a réplica e escritas para o primário.
+
+    Vão para a réplica apenas SELECTs de requisições GET/HEAD (ou marcadas
+    com leituras_na_replica), enquanto a sessão ainda não escreveu nada, o
+    cliente não traz marca de escrita recente e o atraso medido da réplica
+    está dentro da tolerância.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primario = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+        if bind is not None or 'replica' not in engines or primario is not engines[None]:
+            return primario
+
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['escreveu'] = True
+            if has_request_context():
+                g.escreveu_no_primario = True
+            return primario
+
+        if self._pode_usar_replica(clause):
+            return engines['replica']
+        return primario
+
+    def _pode_usar_replica(self, clause):
+        if self.info.get('escreveu') or not getattr(clause, 'is_select', False):
+            return False
+        leitura = has_request_context() and request.method in METODOS_LEITURA
+        if not (leitura or g.get('leituras_na_replica')):
+            return False
+        # Leitura após escrita: o usuário que acabou de escrever lê do primário
+        if leitura and escrita_recente():
+            return False
+
+        atraso = _atraso_replica(self._db.engines['replica'])
+        return atraso is not None and atraso <= ATRASO_MAXIMO
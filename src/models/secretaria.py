@@ -2,6 +2,14 @@ from src.models.database import db, BaseModel
 
 class Secretaria(BaseModel):
     __tablename__ = 'secretarias'
+    __table_args__ = (
+        # Listagens e relatórios consideram apenas secretarias ativas
+        db.Index(
+            'ix_secretarias_ativas', 'id',
+            sqlite_where=db.text('ativa = 1'),
+            postgresql_where=db.text('ativa')
+        ),
+    )
     
     nome = db.Column(db.String(200), nullable=False)
     responsavel = db.Column(db.String(100), nullable=False)
@@ -10,21 +18,18 @@ class Secretaria(BaseModel):
     telefone = db.Column(db.String(20))
     ativa = db.Column(db.Boolean, default=True)
     
+    # Contadores de projetos mantidos por src/models/contadores.py
+    total_projetos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    projetos_planejamento = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    projetos_em_execucao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    projetos_concluidos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    projetos_atrasados = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    recursos_aplicados_total = db.Column(db.Numeric(14, 2), nullable=False, default=0, server_default='0')
+    recursos_pendentes_total = db.Column(db.Numeric(14, 2), nullable=False, default=0, server_default='0')
+    progresso_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # soma do progresso, para médias
+    
+    # Usado apenas para calcular o progresso médio
+    campos_excluidos = ('progresso_total',)
+    
     # Relacionamento com projetos
     projetos = db.relationship('Projeto', backref='secretaria', lazy=True, cascade='all, delete-orphan')
-    
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'responsavel': self.responsavel,
-            'contato': self.contato,
-            'email': self.email,
-            'telefone': self.telefone,
-            'ativa': self.ativa,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'total_projetos': len(self.projetos) if self.projetos else 0
-        }
-
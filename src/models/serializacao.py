@@ -0,0 +1,70 @@
+from sqlalchemy import Date, DateTime, Numeric
+
+
+def _data(valor):
+    return valor.isoformat() if valor else None
+
+
+def _decimal(valor):
+    return float(valor) if valor else 0
+
+
+def _conversor(tipo):
+    """Função de conversão para o tipo da coluna (None = valor usado como está)"""
+    if isinstance(tipo, (Date, DateTime)):
+        return _data
+    if isinstance(tipo, Numeric):
+        return _decimal
+    return None
+
+
+class Serializador:
+    """Conversor de linhas de uma tabela para dicionário.
+
+    É montado uma única vez por modelo a partir das colunas da tabela e
+    funciona tanto sobre linhas do Core (tuplas na ordem de `colunas`) quanto
+    sobre instâncias do ORM.
+    """
+
+    def __init__(self, modelo):
+        excluidos = set(getattr(modelo, 'campos_excluidos', ()))
+        self.colunas = [coluna for coluna in modelo.__table__.columns if coluna.key not in excluidos]
+        self._chaves = [coluna.key for coluna in self.colunas]
+        self._conversores = [
+            (indice, chave, conversor)
+            for indice, (chave, conversor) in enumerate(
+                (coluna.key, _conversor(coluna.type)) for coluna in self.colunas
+            )
+            if conversor is not None
+        ]
+        # Campos derivados: nome -> função que recebe os valores brutos da linha
+        self._calculados = list(getattr(modelo, 'campos_calculados', {}).items())
+
+    def de_linha(self, linha):
+        """Serializa uma linha cujos primeiros valores seguem a ordem de `colunas`"""
+        resultado = dict(zip(self._chaves, linha))
+
+        if self._calculados:
+            brutos = dict(resultado)
+            for nome, calcular in self._calculados:
+                resultado[nome] = calcular(brutos)
+
+        for indice, chave, conversor in self._conversores:
+            resultado[chave] = conversor(linha[indice])
+
+        return resultado
+
+    def de_objeto(self, objeto):
+        """Serializa uma instância do ORM"""
+        return self.de_linha([getattr(objeto, chave) for chave in self._chaves])
+
+
+_serializadores = {}
+
+
+def serializador(modelo):
+    """Serializador do modelo, criado na primeira chamada e reutilizado depois"""
+    try:
+        return _serializadores[modelo]
+    except KeyError:
+        return _serializadores.setdefault(modelo, Serializador(modelo))
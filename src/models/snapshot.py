@@ -0,0 +1,12 @@
+from src.models.database import db
+
+class DashboardSnapshot(db.Model):
+    """Payload de dashboard pré-calculado, invalidado pelas escritas"""
+    __tablename__ = 'dashboard_snapshots'
+    
+    chave = db.Column(db.String(50), primary_key=True)  # dashboard_geral, dashboard_projetos, dashboard_recursos
+    payload = db.Column(db.Text)  # JSON serializado
+    versao = db.Column(db.Integer, nullable=False, default=0)  # incrementada a cada escrita
+    versao_gerada = db.Column(db.Integer)  # versão à qual o payload corresponde
+    data_referencia = db.Column(db.Date)  # dia em que o payload foi gerado
+    gerado_em = db.Column(db.DateTime)
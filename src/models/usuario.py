@@ -10,6 +10,9 @@ class Usuario(BaseModel):
     nivel_acesso = db.Column(db.String(20), nullable=False, default='colaborador')  # administrador, visualizador, colaborador
     ativo = db.Column(db.Boolean, default=True)
     
+    # Nunca expor o hash da senha
+    campos_excluidos = ('senha_hash',)
+    
     def set_senha(self, senha):
         """Define a senha do usuário (hash)"""
         self.senha_hash = generate_password_hash(senha)
@@ -17,16 +20,3 @@ class Usuario(BaseModel):
     def check_senha(self, senha):
         """Verifica se a senha está correta"""
         return check_password_hash(self.senha_hash, senha)
-    
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'email': self.email,
-            'nivel_acesso': self.nivel_acesso,
-            'ativo': self.ativo,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
-
@@ -0,0 +1,58 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.database import db
+from src.models.replica import SessaoRoteada
+
+# Tabelas auxiliares cujas escritas não alteram dados servidos pela API
+TABELAS_IGNORADAS = {'versoes_tabelas', 'dashboard_snapshots', 'schema_migracoes'}
+
+
+class VersaoTabela(db.Model):
+    """Contador de alterações de uma tabela, incrementado na transação de cada escrita"""
+    __tablename__ = 'versoes_tabelas'
+
+    tabela = db.Column(db.String(100), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)  # distingue tabelas recriadas
+
+
+def incrementar_versoes(conexao, tabelas):
+    """Soma 1 à versão das `tabelas` (criando o contador na primeira escrita)"""
+    tabelas = sorted(set(tabelas) - TABELAS_IGNORADAS)
+    if not tabelas:
+        return
+
+    inserir = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}[conexao.dialect.name]
+    comando = inserir(VersaoTabela.__table__)
+    conexao.execute(
+        comando.on_conflict_do_update(
+            index_elements=['tabela'],
+            set_={'versao': VersaoTabela.__table__.c.versao + 1}
+        ),
+        [{'tabela': tabela, 'versao': 1, 'criado_em': datetime.utcnow()} for tabela in tabelas]
+    )
+
+
+@event.listens_for(SessaoRoteada, 'after_flush')
+def _flush(session, contexto_flush):
+    """Escritas pelo ORM (unit of work)"""
+    tabelas = {objeto.__table__.name for objeto in session.new}
+    tabelas.update(objeto.__table__.name for objeto in session.deleted)
+    tabelas.update(
+        objeto.__table__.name for objeto in session.dirty
+        if session.is_modified(objeto, include_collections=False)
+    )
+    if tabelas:
+        incrementar_versoes(session.connection(), tabelas)
+
+
+@event.listens_for(SessaoRoteada, 'do_orm_execute')
+def _comando(estado):
+    """INSERT/UPDATE/DELETE executados com session.execute (lotes, upserts, migrações)"""
+    if not (estado.is_insert or estado.is_update or estado.is_delete):
+        return
+    tabela = getattr(estado.statement, 'table', None)
+    if tabela is not None and tabela.name not in TABELAS_IGNORADAS:
+        conexao = estado.session.connection(bind_arguments={'clause': estado.statement})
+        incrementar_versoes(conexao, [tabela.name])
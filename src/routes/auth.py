@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.database import db
 from src.models.usuario import Usuario
+from src.models.serializacao import serializador
+from src.services.permissoes import claims_usuario, somente_administrador
+from src.services.paginacao import paginar, parametros_paginacao, CursorInvalido
+from src.services.condicional import resposta_condicional
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -22,8 +26,12 @@ def login():
         if not usuario.ativo:
             return jsonify({'error': 'Usuário inativo'}), 401
         
-        # Criar token de acesso
-        access_token = create_access_token(identity=usuario.id)
+        # Criar token de acesso com nível e situação como claims, para que as
+        # rotas autorizem sem consultar o usuário a cada requisição
+        access_token = create_access_token(
+            identity=str(usuario.id),
+            additional_claims=claims_usuario(usuario)
+        )
         
         return jsonify({
             'access_token': access_token,
@@ -35,16 +43,10 @@ def login():
 
 @auth_bp.route('/register', methods=['POST'])
 @jwt_required()
+@somente_administrador
 def register():
     """Endpoint para cadastro de novo usuário (apenas administradores)"""
     try:
-        # Verificar se o usuário atual é administrador
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso != 'administrador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['nome', 'email', 'senha', 'nivel_acesso']):
@@ -76,6 +78,7 @@ def register():
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Usuario)
 def get_current_user():
     """Endpoint para obter dados do usuário atual"""
     try:
@@ -92,20 +95,24 @@ def get_current_user():
 
 @auth_bp.route('/usuarios', methods=['GET'])
 @jwt_required()
+@somente_administrador
+@resposta_condicional(Usuario)
 def list_users():
-    """Endpoint para listar usuários (apenas administradores)"""
+    """Endpoint para listar usuários (apenas administradores), paginado por keyset"""
     try:
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso != 'administrador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
-        usuarios = Usuario.query.all()
+        limite, cursor = parametros_paginacao()
+        serializar = serializador(Usuario)
+        usuarios, proximo_cursor = paginar(
+            db.session.query(*serializar.colunas), [Usuario.id], limite, cursor
+        )
         return jsonify({
-            'usuarios': [usuario.to_dict() for usuario in usuarios]
+            'usuarios': [serializar.de_linha(usuario) for usuario in usuarios],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
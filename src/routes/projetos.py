@@ -1,51 +1,61 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from datetime import datetime, date
 from src.models.database import db
-from src.models.usuario import Usuario
+from src.services.permissoes import escrita_permitida, somente_administrador
 from src.models.projeto import Projeto
 from src.models.secretaria import Secretaria
+from src.models.serializacao import serializador
+from src.services import dashboard as dashboard_service
+from src.services.snapshots import obter_snapshot, invalidar_snapshots
+from src.services.paginacao import paginar, parametros_paginacao, CursorInvalido
+from src.services.condicional import resposta_condicional
+from src.services import lote
+from src.services.relatorios import converter_booleano
+from src.models.contadores import aplicar_inseridos
 
 projetos_bp = Blueprint('projetos', __name__)
 
 @projetos_bp.route('/', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Projeto)
 def list_projetos():
-    """Listar todos os projetos com filtros opcionais"""
+    """Listar projetos com filtros opcionais, paginados por keyset (limit/cursor)"""
     try:
         # Parâmetros de filtro
         secretaria_id = request.args.get('secretaria_id', type=int)
         status = request.args.get('status')
+        limite, cursor = parametros_paginacao()
         
-        query = Projeto.query
+        # Consulta por colunas: linhas do Core, sem hidratar objetos do ORM
+        serializar = serializador(Projeto)
+        query = db.session.query(*serializar.colunas)
         
         if secretaria_id:
-            query = query.filter_by(secretaria_id=secretaria_id)
+            query = query.filter(Projeto.secretaria_id == secretaria_id)
         
         if status:
-            query = query.filter_by(status=status)
+            query = query.filter(Projeto.status == status)
         
-        projetos = query.all()
+        projetos, proximo_cursor = paginar(query, [Projeto.id], limite, cursor)
         
         return jsonify({
-            'projetos': [projeto.to_dict() for projeto in projetos]
+            'projetos': [serializar.de_linha(projeto) for projeto in projetos],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @projetos_bp.route('/', methods=['POST'])
 @jwt_required()
+@escrita_permitida
 def create_projeto():
     """Criar novo projeto"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['titulo', 'secretaria_id']):
@@ -83,6 +93,7 @@ def create_projeto():
             novo_projeto.observacoes = data['observacoes']
         
         db.session.add(novo_projeto)
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -94,8 +105,45 @@ def create_projeto():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@projetos_bp.route('/lote', methods=['POST'])
+@jwt_required()
+@escrita_permitida
+def create_projetos_lote():
+    """Criar vários projetos em uma transação (lista JSON com os campos de POST /)
+
+    Com ?parcial=true os itens válidos são gravados mesmo havendo inválidos.
+    """
+    try:
+        parcial = converter_booleano(request.args.get('parcial'))
+        resultados, inseridos = lote.inserir_lote(
+            Projeto, request.get_json(silent=True), lote.converter_projeto, parcial,
+            validar=lote.validar_secretarias
+        )
+        
+        if not inseridos:
+            db.session.rollback()
+            return jsonify({'error': 'Nenhum projeto gravado', 'resultados': resultados}), 400
+        
+        # O insert em massa não passa pelos eventos do ORM: contadores somados aqui
+        aplicar_inseridos(db.session.connection(), inseridos)
+        invalidar_snapshots()
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Projetos criados com sucesso',
+            'inseridos': len(inseridos),
+            'resultados': resultados
+        }), 201
+        
+    except lote.LoteInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @projetos_bp.route('/<int:projeto_id>', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Projeto)
 def get_projeto(projeto_id):
     """Obter detalhes de um projeto específico"""
     try:
@@ -107,16 +155,10 @@ def get_projeto(projeto_id):
 
 @projetos_bp.route('/<int:projeto_id>', methods=['PUT'])
 @jwt_required()
+@escrita_permitida
 def update_projeto(projeto_id):
     """Atualizar dados de um projeto"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         projeto = Projeto.query.get_or_404(projeto_id)
         data = request.get_json()
         
@@ -151,6 +193,7 @@ def update_projeto(projeto_id):
             if not projeto.data_termino_real:
                 projeto.data_termino_real = date.today()
         
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -164,19 +207,14 @@ def update_projeto(projeto_id):
 
 @projetos_bp.route('/<int:projeto_id>', methods=['DELETE'])
 @jwt_required()
+@somente_administrador
 def delete_projeto(projeto_id):
     """Excluir um projeto"""
     try:
-        # Verificar permissões (apenas administradores)
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso != 'administrador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         projeto = Projeto.query.get_or_404(projeto_id)
         
         db.session.delete(projeto)
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({'message': 'Projeto excluído com sucesso'}), 200
@@ -187,43 +225,11 @@ def delete_projeto(projeto_id):
 
 @projetos_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Projeto, Secretaria)
 def dashboard_projetos():
     """Dados para o dashboard de projetos"""
     try:
-        # Estatísticas gerais
-        total_projetos = Projeto.query.count()
-        projetos_concluidos = Projeto.query.filter_by(status='concluido').count()
-        projetos_em_execucao = Projeto.query.filter_by(status='execucao').count()
-        projetos_atrasados = Projeto.query.filter_by(status='atrasado').count()
-        
-        # Projetos por secretaria
-        from sqlalchemy import func
-        projetos_por_secretaria = db.session.query(
-            Secretaria.nome,
-            func.count(Projeto.id).label('total')
-        ).join(Projeto).group_by(Secretaria.id, Secretaria.nome).all()
-        
-        # Projetos próximos do vencimento (próximos 7 dias)
-        from datetime import timedelta
-        data_limite = date.today() + timedelta(days=7)
-        projetos_vencendo = Projeto.query.filter(
-            Projeto.data_previsao_termino <= data_limite,
-            Projeto.status.in_(['planejamento', 'execucao'])
-        ).all()
-        
-        return jsonify({
-            'estatisticas': {
-                'total_projetos': total_projetos,
-                'projetos_concluidos': projetos_concluidos,
-                'projetos_em_execucao': projetos_em_execucao,
-                'projetos_atrasados': projetos_atrasados
-            },
-            'projetos_por_secretaria': [
-                {'secretaria': nome, 'total': total} 
-                for nome, total in projetos_por_secretaria
-            ],
-            'projetos_vencendo': [projeto.to_dict() for projeto in projetos_vencendo]
-        }), 200
+        return jsonify(obter_snapshot('dashboard_projetos', dashboard_service.dashboard_projetos)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
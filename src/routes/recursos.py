@@ -1,108 +1,162 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, date
+import io
+import json
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
 from src.models.database import db
-from src.models.usuario import Usuario
-from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+from src.services.permissoes import escrita_permitida
+from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico, primeiro_dia_mes, intervalo_ano
+from src.models.serializacao import serializador
+from src.services import dashboard as dashboard_service
+from src.services.snapshots import obter_snapshot, invalidar_snapshots
+from src.services.paginacao import paginar, parametros_paginacao, CursorInvalido
+from src.services.condicional import resposta_condicional
+from src.services import lote
+from src.services.relatorios import converter_booleano
+from src.services import importacao
 
 recursos_bp = Blueprint('recursos', __name__)
 
+def _criar_lote(modelo, converter, mensagem):
+    """Insere a lista de registros do corpo em uma transação e responde por item
+
+    Com ?parcial=true os itens válidos são gravados mesmo havendo inválidos.
+    """
+    try:
+        parcial = converter_booleano(request.args.get('parcial'))
+        resultados, inseridos = lote.inserir_lote(modelo, request.get_json(silent=True), converter, parcial)
+        
+        if not inseridos:
+            db.session.rollback()
+            return jsonify({'error': 'Nenhum registro gravado', 'resultados': resultados}), 400
+        
+        invalidar_snapshots()
+        db.session.commit()
+        
+        return jsonify({
+            'message': mensagem,
+            'inseridos': len(inseridos),
+            'resultados': resultados
+        }), 201
+        
+    except lote.LoteInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 # === CONTAS PAGAS ===
 @recursos_bp.route('/contas', methods=['GET'])
 @jwt_required()
+@resposta_condicional(ContaPaga)
 def list_contas():
-    """Listar contas pagas com filtros opcionais"""
+    """Listar contas pagas com filtros opcionais, paginadas por keyset (limit/cursor)"""
     try:
         # Parâmetros de filtro
         tipo_conta = request.args.get('tipo_conta')
         mes_referencia = request.args.get('mes_referencia')
         ano = request.args.get('ano')
+        if ano is not None and not ano.isdigit():
+            return jsonify({'error': 'ano deve ser numérico'}), 400
+        limite, cursor = parametros_paginacao()
         
-        query = ContaPaga.query
+        serializar = serializador(ContaPaga)
+        query = db.session.query(*serializar.colunas)
         
         if tipo_conta:
-            query = query.filter_by(tipo_conta=tipo_conta)
+            query = query.filter(ContaPaga.tipo_conta == tipo_conta)
         
         if mes_referencia:
-            query = query.filter_by(mes_referencia=mes_referencia)
+            query = query.filter(ContaPaga.data_referencia == primeiro_dia_mes(mes_referencia))
         
         if ano:
-            query = query.filter(ContaPaga.mes_referencia.like(f'{ano}-%'))
+            query = query.filter(intervalo_ano(int(ano)))
         
-        contas = query.order_by(ContaPaga.mes_referencia.desc()).all()
+        contas, proximo_cursor = paginar(
+            query, [ContaPaga.mes_referencia, ContaPaga.id], limite, cursor, descendente=True
+        )
         
         return jsonify({
-            'contas': [conta.to_dict() for conta in contas]
+            'contas': [serializar.de_linha(conta) for conta in contas],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except ValueError as e:  # cursor ou mes_referencia inválidos
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @recursos_bp.route('/contas', methods=['POST'])
 @jwt_required()
+@escrita_permitida
 def create_conta():
-    """Criar registro de conta paga"""
+    """Registrar conta paga; a mesma conta (tipo e mês) reenviada é atualizada, não duplicada"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['tipo_conta', 'mes_referencia', 'valor', 'data_pagamento']):
             return jsonify({'error': 'Dados obrigatórios: tipo_conta, mes_referencia, valor, data_pagamento'}), 400
         
-        nova_conta = ContaPaga(
-            tipo_conta=data['tipo_conta'],
-            mes_referencia=data['mes_referencia'],
-            valor=float(data['valor']),
-            data_pagamento=datetime.strptime(data['data_pagamento'], '%Y-%m-%d').date(),
-            arquivo_comprovante=data.get('arquivo_comprovante'),
-            observacoes=data.get('observacoes')
-        )
-        
-        db.session.add(nova_conta)
+        conta_id = db.session.execute(
+            lote.insert_ou_atualizar(ContaPaga).returning(ContaPaga.id),
+            lote.converter_conta(data)
+        ).scalar_one()
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
             'message': 'Conta registrada com sucesso',
-            'conta': nova_conta.to_dict()
+            'conta': db.session.get(ContaPaga, conta_id).to_dict()
         }), 201
         
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@recursos_bp.route('/contas/lote', methods=['POST'])
+@jwt_required()
+@escrita_permitida
+def create_contas_lote():
+    """Registrar várias contas pagas (lista JSON com os campos de POST /contas)"""
+    return _criar_lote(ContaPaga, lote.converter_conta, 'Contas registradas com sucesso')
+
 # === MATERIAIS DE ESCRITÓRIO ===
 @recursos_bp.route('/materiais', methods=['GET'])
 @jwt_required()
+@resposta_condicional(MaterialEscritorio)
 def list_materiais():
-    """Listar materiais de escritório"""
+    """Listar materiais de escritório, paginados por keyset (limit/cursor)"""
     try:
-        materiais = MaterialEscritorio.query.order_by(MaterialEscritorio.data_entrada.desc()).all()
+        limite, cursor = parametros_paginacao()
+        serializar = serializador(MaterialEscritorio)
+        materiais, proximo_cursor = paginar(
+            db.session.query(*serializar.colunas),
+            [MaterialEscritorio.data_entrada, MaterialEscritorio.id],
+            limite, cursor, descendente=True
+        )
         
         return jsonify({
-            'materiais': [material.to_dict() for material in materiais]
+            'materiais': [serializar.de_linha(material) for material in materiais],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @recursos_bp.route('/materiais', methods=['POST'])
 @jwt_required()
+@escrita_permitida
 def create_material():
     """Criar registro de material de escritório"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['nome', 'quantidade', 'data_entrada']):
@@ -119,6 +173,7 @@ def create_material():
         )
         
         db.session.add(novo_material)
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -130,33 +185,45 @@ def create_material():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@recursos_bp.route('/materiais/lote', methods=['POST'])
+@jwt_required()
+@escrita_permitida
+def create_materiais_lote():
+    """Registrar vários materiais (lista JSON com os campos de POST /materiais)"""
+    return _criar_lote(MaterialEscritorio, lote.converter_material, 'Materiais registrados com sucesso')
+
 # === RECURSOS ESTRATÉGICOS ===
 @recursos_bp.route('/estrategicos', methods=['GET'])
 @jwt_required()
+@resposta_condicional(RecursoEstrategico)
 def list_recursos_estrategicos():
-    """Listar recursos estratégicos"""
+    """Listar recursos estratégicos, paginados por keyset (limit/cursor)"""
     try:
-        recursos = RecursoEstrategico.query.order_by(RecursoEstrategico.data_chegada.desc()).all()
+        limite, cursor = parametros_paginacao()
+        serializar = serializador(RecursoEstrategico)
+        recursos, proximo_cursor = paginar(
+            db.session.query(*serializar.colunas),
+            [RecursoEstrategico.data_chegada, RecursoEstrategico.id],
+            limite, cursor, descendente=True
+        )
         
         return jsonify({
-            'recursos': [recurso.to_dict() for recurso in recursos]
+            'recursos': [serializar.de_linha(recurso) for recurso in recursos],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @recursos_bp.route('/estrategicos', methods=['POST'])
 @jwt_required()
+@escrita_permitida
 def create_recurso_estrategico():
     """Criar registro de recurso estratégico"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['nome', 'descricao', 'quantidade', 'data_chegada']):
@@ -174,6 +241,7 @@ def create_recurso_estrategico():
         )
         
         db.session.add(novo_recurso)
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -185,54 +253,52 @@ def create_recurso_estrategico():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@recursos_bp.route('/estrategicos/lote', methods=['POST'])
+@jwt_required()
+@escrita_permitida
+def create_recursos_estrategicos_lote():
+    """Registrar vários recursos estratégicos (lista JSON com os campos de POST /estrategicos)"""
+    return _criar_lote(RecursoEstrategico, lote.converter_recurso, 'Recursos estratégicos registrados com sucesso')
+
+# === IMPORTAÇÃO DE CSV ===
+@recursos_bp.route('/importar/<tabela>', methods=['POST'])
+@jwt_required()
+@escrita_permitida
+def importar_csv(tabela):
+    """Importar contas ou materiais de um CSV (campo 'arquivo' ou corpo text/csv)
+
+    A resposta é NDJSON com os erros de cada linha rejeitada, o andamento a
+    cada bloco gravado e os totais ao final. Aceita ?encoding= (padrão utf-8).
+    """
+    try:
+        if tabela not in importacao.IMPORTAVEIS:
+            return jsonify({'error': 'Tabela não disponível para importação'}), 404
+        
+        arquivo = request.files.get('arquivo')
+        fluxo = arquivo.stream if arquivo else io.BufferedReader(request.stream)
+        
+        try:
+            texto = io.TextIOWrapper(fluxo, encoding=request.args.get('encoding', 'utf-8-sig'), newline='')
+            eventos = importacao.importar_csv(tabela, texto)
+        except (ValueError, LookupError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return Response(
+            stream_with_context(json.dumps(evento, ensure_ascii=False) + '\n' for evento in eventos),
+            mimetype='application/x-ndjson'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # === DASHBOARD DE RECURSOS ===
 @recursos_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@resposta_condicional(ContaPaga, MaterialEscritorio, RecursoEstrategico)
 def dashboard_recursos():
     """Dados para o dashboard de recursos"""
     try:
-        from sqlalchemy import func, extract
-        
-        # Gastos por tipo de conta no ano atual
-        ano_atual = date.today().year
-        gastos_por_tipo = db.session.query(
-            ContaPaga.tipo_conta,
-            func.sum(ContaPaga.valor).label('total')
-        ).filter(
-            ContaPaga.mes_referencia.like(f'{ano_atual}-%')
-        ).group_by(ContaPaga.tipo_conta).all()
-        
-        # Total de gastos no mês atual
-        mes_atual = date.today().strftime('%Y-%m')
-        gastos_mes_atual = db.session.query(
-            func.sum(ContaPaga.valor)
-        ).filter_by(mes_referencia=mes_atual).scalar() or 0
-        
-        # Materiais recebidos nos últimos 30 dias
-        from datetime import timedelta
-        data_limite = date.today() - timedelta(days=30)
-        materiais_recentes = MaterialEscritorio.query.filter(
-            MaterialEscritorio.data_entrada >= data_limite
-        ).count()
-        
-        # Recursos estratégicos por status
-        recursos_por_status = db.session.query(
-            RecursoEstrategico.status,
-            func.count(RecursoEstrategico.id).label('total')
-        ).group_by(RecursoEstrategico.status).all()
-        
-        return jsonify({
-            'gastos_por_tipo': [
-                {'tipo': tipo, 'total': float(total)} 
-                for tipo, total in gastos_por_tipo
-            ],
-            'gastos_mes_atual': float(gastos_mes_atual),
-            'materiais_recentes': materiais_recentes,
-            'recursos_por_status': [
-                {'status': status, 'total': total} 
-                for status, total in recursos_por_status
-            ]
-        }), 200
+        return jsonify(obter_snapshot('dashboard_recursos', dashboard_service.dashboard_recursos)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -240,15 +306,10 @@ def dashboard_recursos():
 # === ENDPOINTS DE ATUALIZAÇÃO E EXCLUSÃO ===
 @recursos_bp.route('/contas/<int:conta_id>', methods=['PUT'])
 @jwt_required()
+@escrita_permitida
 def update_conta(conta_id):
     """Atualizar conta paga"""
     try:
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         conta = ContaPaga.query.get_or_404(conta_id)
         data = request.get_json()
         
@@ -265,6 +326,7 @@ def update_conta(conta_id):
         if 'observacoes' in data:
             conta.observacoes = data['observacoes']
         
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -272,6 +334,12 @@ def update_conta(conta_id):
             'conta': conta.to_dict()
         }), 200
         
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Já existe uma conta deste tipo para o mês de referência'}), 409
+    except ValueError as e:  # mes_referencia, valor ou data_pagamento inválidos
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,72 +1,91 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, date
-from src.models.database import db
-from src.models.usuario import Usuario
+import json
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, send_file
+from flask_jwt_extended import jwt_required
+from datetime import datetime
 from src.models.secretaria import Secretaria
 from src.models.projeto import Projeto
-from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+from src.models.recursos import ContaPaga, MaterialEscritorio
+from src.services import relatorios as relatorios_service
+from src.services import dashboard as dashboard_service
+from src.services.snapshots import obter_snapshot
+from src.services import exportacao
+from src.services import jobs as jobs_service
+from src.services.cache_consultas import em_cache
+from src.services import relatorio_paralelo
+from src.services.condicional import resposta_condicional
 
 relatorios_bp = Blueprint('relatorios', __name__)
 
+def _parametro_booleano(nome, padrao=False):
+    """Lê um parâmetro de query string no formato true/false"""
+    return relatorios_service.converter_booleano(request.args.get(nome), padrao)
+
+def _relatorio_em_blocos(blocos, periodo, **parametros):
+    """Resposta do relatório de secretarias montada bloco a bloco (streaming)
+
+    O primeiro bloco é calculado antes de a resposta começar, de modo que uma
+    falha inicial ainda vira um erro 500. Se um bloco seguinte falhar, o
+    documento é fechado com o campo "erro" em vez de ficar truncado.
+    """
+    partes = relatorio_paralelo.partes_relatorio(blocos, **parametros)
+    primeira = next(partes, None)
+
+    def gerar():
+        yield '{"periodo":%s,"relatorio":[' % json.dumps(periodo, sort_keys=True, separators=(',', ':'))
+        try:
+            if primeira is not None:
+                yield primeira
+                for parte in partes:
+                    yield ',' + parte
+        except Exception as e:
+            yield '],"erro":%s}\n' % json.dumps(str(e), ensure_ascii=False)
+            return
+        yield ']}\n'
+    return Response(gerar(), mimetype='application/json')
+
 @relatorios_bp.route('/secretarias', methods=['GET'])
 @jwt_required()
+@resposta_condicional(*relatorios_service.TABELAS_RELATORIO['secretarias'])
 def relatorio_secretarias():
-    """Relatório geral de secretarias"""
+    """Relatório geral de secretarias
+
+    Os projetos de cada secretaria só são incluídos com incluir_projetos=true.
+    Com muitas secretarias (ou paralelo=true) o relatório é calculado em
+    blocos por um pool de processos e enviado à medida que fica pronto.
+    """
     try:
         # Parâmetros de filtro
         periodo_inicio = request.args.get('periodo_inicio')
         periodo_fim = request.args.get('periodo_fim')
         secretaria_id = request.args.get('secretaria_id', type=int)
         
-        # Query base
-        query = Secretaria.query.filter_by(ativa=True)
-        
-        if secretaria_id:
-            query = query.filter_by(id=secretaria_id)
-        
-        secretarias = query.all()
-        
-        relatorio = []
-        
-        for secretaria in secretarias:
-            # Filtrar projetos por período se especificado
-            projetos_query = Projeto.query.filter_by(secretaria_id=secretaria.id)
-            
-            if periodo_inicio:
-                data_inicio = datetime.strptime(periodo_inicio, '%Y-%m-%d').date()
-                projetos_query = projetos_query.filter(Projeto.data_inicio >= data_inicio)
-            
-            if periodo_fim:
-                data_fim = datetime.strptime(periodo_fim, '%Y-%m-%d').date()
-                projetos_query = projetos_query.filter(Projeto.data_inicio <= data_fim)
-            
-            projetos = projetos_query.all()
-            
-            # Estatísticas da secretaria
-            total_projetos = len(projetos)
-            projetos_concluidos = len([p for p in projetos if p.status == 'concluido'])
-            projetos_em_execucao = len([p for p in projetos if p.status == 'execucao'])
-            projetos_atrasados = len([p for p in projetos if p.status == 'atrasado'])
-            
-            recursos_aplicados = sum([float(p.recursos_aplicados or 0) for p in projetos])
-            recursos_pendentes = sum([float(p.recursos_pendentes or 0) for p in projetos])
-            
-            progresso_medio = sum([p.progresso for p in projetos]) / total_projetos if total_projetos > 0 else 0
-            
-            relatorio.append({
-                'secretaria': secretaria.to_dict(),
-                'estatisticas': {
-                    'total_projetos': total_projetos,
-                    'projetos_concluidos': projetos_concluidos,
-                    'projetos_em_execucao': projetos_em_execucao,
-                    'projetos_atrasados': projetos_atrasados,
-                    'recursos_aplicados': recursos_aplicados,
-                    'recursos_pendentes': recursos_pendentes,
-                    'progresso_medio': round(progresso_medio, 2)
-                },
-                'projetos': [projeto.to_dict() for projeto in projetos]
-            })
+        incluir_projetos = _parametro_booleano('incluir_projetos')
+        
+        data_inicio = datetime.strptime(periodo_inicio, '%Y-%m-%d').date() if periodo_inicio else None
+        data_fim = datetime.strptime(periodo_fim, '%Y-%m-%d').date() if periodo_fim else None
+        
+        paralelo = _parametro_booleano('paralelo', padrao=None)
+        if not secretaria_id and paralelo is not False:
+            if paralelo or relatorio_paralelo.usar_modo_paralelo():
+                return _relatorio_em_blocos(
+                    relatorio_paralelo.blocos_secretarias(),
+                    {'inicio': periodo_inicio, 'fim': periodo_fim},
+                    data_inicio=data_inicio,
+                    data_fim=data_fim,
+                    incluir_projetos=incluir_projetos
+                )
+        
+        relatorio = em_cache(
+            'relatorio_secretarias',
+            relatorios_service.TABELAS_RELATORIO['secretarias'],
+            [data_inicio, data_fim, secretaria_id, incluir_projetos],
+            lambda: relatorios_service.relatorio_secretarias(
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                secretaria_id=secretaria_id,
+                incluir_projetos=incluir_projetos
+            )
+        )
         
         return jsonify({
             'relatorio': relatorio,
@@ -81,8 +100,13 @@ def relatorio_secretarias():
 
 @relatorios_bp.route('/governo', methods=['GET'])
 @jwt_required()
+@resposta_condicional(*relatorios_service.TABELAS_RELATORIO['governo'])
 def relatorio_governo():
-    """Relatório geral da Secretaria de Governo"""
+    """Relatório geral da Secretaria de Governo
+
+    Aceita incluir_detalhes=false para retornar apenas os totais, ou
+    limite/pagina para paginar as listas de detalhes.
+    """
     try:
         # Parâmetros de filtro
         periodo_inicio = request.args.get('periodo_inicio')
@@ -98,79 +122,28 @@ def relatorio_governo():
         if periodo_fim:
             data_fim = datetime.strptime(periodo_fim, '%Y-%m-%d').date()
         
-        # === GASTOS (CONTAS PAGAS) ===
-        contas_query = ContaPaga.query
-        
-        if data_inicio and data_fim:
-            # Filtrar por período de pagamento
-            contas_query = contas_query.filter(
-                ContaPaga.data_pagamento >= data_inicio,
-                ContaPaga.data_pagamento <= data_fim
-            )
-        
-        contas = contas_query.all()
-        
-        # Agrupar gastos por tipo
-        gastos_por_tipo = {}
-        total_gastos = 0
-        
-        for conta in contas:
-            tipo = conta.tipo_conta
-            valor = float(conta.valor)
-            
-            if tipo not in gastos_por_tipo:
-                gastos_por_tipo[tipo] = 0
-            
-            gastos_por_tipo[tipo] += valor
-            total_gastos += valor
-        
-        # === MATERIAIS DE ESCRITÓRIO ===
-        materiais_query = MaterialEscritorio.query
-        
-        if data_inicio and data_fim:
-            materiais_query = materiais_query.filter(
-                MaterialEscritorio.data_entrada >= data_inicio,
-                MaterialEscritorio.data_entrada <= data_fim
-            )
-        
-        materiais = materiais_query.all()
-        total_materiais = len(materiais)
-        valor_total_materiais = sum([float(m.valor_unitario or 0) * m.quantidade for m in materiais])
-        
-        # === RECURSOS ESTRATÉGICOS ===
-        recursos_query = RecursoEstrategico.query
-        
-        if data_inicio and data_fim:
-            recursos_query = recursos_query.filter(
-                RecursoEstrategico.data_chegada >= data_inicio,
-                RecursoEstrategico.data_chegada <= data_fim
+        # Detalhes podem ser omitidos (incluir_detalhes=false) ou paginados
+        incluir_detalhes = _parametro_booleano('incluir_detalhes', padrao=True)
+        limite = request.args.get('limite', type=int)
+        pagina = max(1, request.args.get('pagina', 1, type=int))
+        if limite is not None and limite < 1:
+            return jsonify({'error': 'limite deve ser maior que zero'}), 400
+        
+        resumo = em_cache(
+            'relatorio_governo',
+            relatorios_service.TABELAS_RELATORIO['governo'],
+            [data_inicio, data_fim, incluir_detalhes, limite, pagina],
+            lambda: relatorios_service.relatorio_governo(
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                incluir_detalhes=incluir_detalhes,
+                limite=limite,
+                pagina=pagina
             )
-        
-        recursos = recursos_query.all()
-        total_recursos = len(recursos)
-        valor_total_recursos = sum([float(r.valor or 0) for r in recursos])
-        
-        # === RESUMO GERAL ===
-        resumo = {
-            'gastos': {
-                'total': total_gastos,
-                'por_tipo': gastos_por_tipo,
-                'detalhes': [conta.to_dict() for conta in contas]
-            },
-            'materiais': {
-                'total_itens': total_materiais,
-                'valor_total': valor_total_materiais,
-                'detalhes': [material.to_dict() for material in materiais]
-            },
-            'recursos_estrategicos': {
-                'total_itens': total_recursos,
-                'valor_total': valor_total_recursos,
-                'detalhes': [recurso.to_dict() for recurso in recursos]
-            },
-            'periodo': {
-                'inicio': periodo_inicio,
-                'fim': periodo_fim
-            }
+        )
+        resumo['periodo'] = {
+            'inicio': periodo_inicio,
+            'fim': periodo_fim
         }
         
         return jsonify({'relatorio': resumo}), 200
@@ -178,99 +151,101 @@ def relatorio_governo():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@relatorios_bp.route('/dashboard-geral', methods=['GET'])
+# === JOBS ASSÍNCRONOS DE RELATÓRIO ===
+@relatorios_bp.route('/jobs', methods=['POST'])
 @jwt_required()
-def dashboard_geral():
-    """Dashboard geral com todas as informações principais"""
+def criar_job_relatorio():
+    """Agendar a geração de um relatório (secretarias ou governo) em segundo plano
+
+    Corpo: {"tipo": "secretarias" | "governo", "parametros": {...}}, com os
+    mesmos parâmetros da query string do endpoint síncrono.
+    """
     try:
-        from sqlalchemy import func
+        data = request.get_json()
         
-        # === ESTATÍSTICAS GERAIS ===
-        total_secretarias = Secretaria.query.filter_by(ativa=True).count()
-        total_projetos = Projeto.query.count()
-        projetos_concluidos = Projeto.query.filter_by(status='concluido').count()
-        projetos_atrasados = Projeto.query.filter_by(status='atrasado').count()
+        if not data or not data.get('tipo'):
+            return jsonify({'error': 'Tipo do relatório é obrigatório'}), 400
         
-        # === PROJETOS POR STATUS ===
-        projetos_por_status = db.session.query(
-            Projeto.status,
-            func.count(Projeto.id).label('total')
-        ).group_by(Projeto.status).all()
+        parametros = data.get('parametros') or {}
+        if not isinstance(parametros, dict):
+            return jsonify({'error': 'Parâmetros inválidos'}), 400
         
-        # === PROJETOS POR SECRETARIA ===
-        projetos_por_secretaria = db.session.query(
-            Secretaria.nome,
-            func.count(Projeto.id).label('total')
-        ).join(Projeto).group_by(Secretaria.id, Secretaria.nome).all()
+        try:
+            job = jobs_service.criar_job(current_app._get_current_object(), data['tipo'], parametros)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # === ALERTAS ===
-        alertas = []
+        return jsonify({'job': job}), 202
         
-        # Projetos próximos do vencimento (próximos 7 dias)
-        from datetime import timedelta
-        data_limite = date.today() + timedelta(days=7)
-        projetos_vencendo = Projeto.query.filter(
-            Projeto.data_previsao_termino <= data_limite,
-            Projeto.status.in_(['planejamento', 'execucao'])
-        ).all()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def status_job_relatorio(job_id):
+    """Consultar o status de um job de relatório"""
+    try:
+        job = jobs_service.obter_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
         
-        for projeto in projetos_vencendo:
-            alertas.append({
-                'tipo': 'projeto_vencendo',
-                'mensagem': f'Projeto "{projeto.titulo}" vence em breve',
-                'data': projeto.data_previsao_termino.isoformat() if projeto.data_previsao_termino else None,
-                'projeto_id': projeto.id
-            })
+        return jsonify({'job': job}), 200
         
-        # Projetos com recursos pendentes
-        projetos_recursos_pendentes = Projeto.query.filter(
-            Projeto.recursos_pendentes > 0
-        ).all()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/jobs/<job_id>/resultado', methods=['GET'])
+@jwt_required()
+def resultado_job_relatorio(job_id):
+    """Baixar o resultado de um job de relatório concluído"""
+    try:
+        job = jobs_service.obter_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
         
-        for projeto in projetos_recursos_pendentes:
-            alertas.append({
-                'tipo': 'recursos_pendentes',
-                'mensagem': f'Projeto "{projeto.titulo}" tem recursos pendentes: R$ {projeto.recursos_pendentes}',
-                'valor': float(projeto.recursos_pendentes),
-                'projeto_id': projeto.id
-            })
+        if job['status'] != 'concluido':
+            return jsonify({'error': 'Relatório ainda não concluído', 'job': job}), 409
         
-        # === GASTOS RECENTES ===
-        # Gastos do mês atual
-        mes_atual = date.today().strftime('%Y-%m')
-        gastos_mes_atual = db.session.query(
-            func.sum(ContaPaga.valor)
-        ).filter_by(mes_referencia=mes_atual).scalar() or 0
+        return send_file(jobs_service.caminho_resultado(job), mimetype='application/json')
         
-        # === MATERIAIS RECENTES ===
-        data_limite_materiais = date.today() - timedelta(days=30)
-        materiais_recentes = MaterialEscritorio.query.filter(
-            MaterialEscritorio.data_entrada >= data_limite_materiais
-        ).count()
+    except FileNotFoundError:
+        return jsonify({'error': 'Resultado expirado, agende o relatório novamente'}), 410
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/<tabela>/export', methods=['GET'])
+@jwt_required()
+@resposta_condicional(modelos_da_rota=lambda tabela: [exportacao.EXPORTAVEIS[tabela]] if tabela in exportacao.EXPORTAVEIS else [])
+def exportar_tabela(tabela):
+    """Exportação completa de uma tabela em CSV ou NDJSON (streaming)
+
+    Tabelas: contas, projetos, materiais, estrategicos.
+    """
+    try:
+        modelo = exportacao.EXPORTAVEIS.get(tabela)
+        if not modelo:
+            return jsonify({'error': 'Tabela não disponível para exportação'}), 404
         
-        dashboard = {
-            'estatisticas_gerais': {
-                'total_secretarias': total_secretarias,
-                'total_projetos': total_projetos,
-                'projetos_concluidos': projetos_concluidos,
-                'projetos_atrasados': projetos_atrasados,
-                'taxa_conclusao': round((projetos_concluidos / total_projetos * 100) if total_projetos > 0 else 0, 2)
-            },
-            'projetos_por_status': [
-                {'status': status, 'total': total} 
-                for status, total in projetos_por_status
-            ],
-            'projetos_por_secretaria': [
-                {'secretaria': nome, 'total': total} 
-                for nome, total in projetos_por_secretaria
-            ],
-            'alertas': alertas,
-            'resumo_financeiro': {
-                'gastos_mes_atual': float(gastos_mes_atual),
-                'materiais_recentes': materiais_recentes
-            }
-        }
+        formato = request.args.get('format', 'csv')
+        if formato not in exportacao.FORMATOS:
+            return jsonify({'error': 'Formato inválido: use csv ou ndjson'}), 400
+        
+        return Response(
+            stream_with_context(exportacao.exportar(modelo, formato)),
+            mimetype=exportacao.FORMATOS[formato],
+            headers={'Content-Disposition': f'attachment; filename={tabela}.{formato}'}
+        )
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/dashboard-geral', methods=['GET'])
+@jwt_required()
+@resposta_condicional(Secretaria, Projeto, ContaPaga, MaterialEscritorio)
+def dashboard_geral():
+    """Dashboard geral com todas as informações principais"""
+    try:
+        dashboard = obter_snapshot('dashboard_geral', dashboard_service.dashboard_geral)
         return jsonify({'dashboard': dashboard}), 200
         
     except Exception as e:
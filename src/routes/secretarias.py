@@ -1,36 +1,44 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from src.models.database import db
-from src.models.usuario import Usuario
+from src.services.permissoes import escrita_permitida, somente_administrador
 from src.models.secretaria import Secretaria
+from src.models.projeto import Projeto
+from src.models.serializacao import serializador
+from src.services.snapshots import invalidar_snapshots
+from src.services.paginacao import paginar, parametros_paginacao, CursorInvalido
+from src.services.condicional import resposta_condicional
 
 secretarias_bp = Blueprint('secretarias', __name__)
 
 @secretarias_bp.route('/', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Secretaria, Projeto)
 def list_secretarias():
-    """Listar todas as secretarias"""
+    """Listar secretarias ativas, paginadas por keyset (limit/cursor)"""
     try:
-        secretarias = Secretaria.query.filter_by(ativa=True).all()
+        limite, cursor = parametros_paginacao()
+        serializar = serializador(Secretaria)
+        query = db.session.query(*serializar.colunas).filter(Secretaria.ativa == True)
+        
+        secretarias, proximo_cursor = paginar(query, [Secretaria.id], limite, cursor)
         return jsonify({
-            'secretarias': [secretaria.to_dict() for secretaria in secretarias]
+            'secretarias': [serializar.de_linha(secretaria) for secretaria in secretarias],
+            'limit': limite,
+            'next_cursor': proximo_cursor
         }), 200
         
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @secretarias_bp.route('/', methods=['POST'])
 @jwt_required()
+@escrita_permitida
 def create_secretaria():
     """Criar nova secretaria"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         data = request.get_json()
         
         if not data or not all(k in data for k in ['nome', 'responsavel']):
@@ -45,6 +53,7 @@ def create_secretaria():
         )
         
         db.session.add(nova_secretaria)
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -58,6 +67,7 @@ def create_secretaria():
 
 @secretarias_bp.route('/<int:secretaria_id>', methods=['GET'])
 @jwt_required()
+@resposta_condicional(Secretaria, Projeto)
 def get_secretaria(secretaria_id):
     """Obter detalhes de uma secretaria específica"""
     try:
@@ -69,16 +79,10 @@ def get_secretaria(secretaria_id):
 
 @secretarias_bp.route('/<int:secretaria_id>', methods=['PUT'])
 @jwt_required()
+@escrita_permitida
 def update_secretaria(secretaria_id):
     """Atualizar dados de uma secretaria"""
     try:
-        # Verificar permissões
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso == 'visualizador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         secretaria = Secretaria.query.get_or_404(secretaria_id)
         data = request.get_json()
         
@@ -97,6 +101,7 @@ def update_secretaria(secretaria_id):
         if 'telefone' in data:
             secretaria.telefone = data['telefone']
         
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({
@@ -110,19 +115,14 @@ def update_secretaria(secretaria_id):
 
 @secretarias_bp.route('/<int:secretaria_id>', methods=['DELETE'])
 @jwt_required()
+@somente_administrador
 def delete_secretaria(secretaria_id):
     """Desativar uma secretaria (soft delete)"""
     try:
-        # Verificar permissões (apenas administradores)
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or current_user.nivel_acesso != 'administrador':
-            return jsonify({'error': 'Acesso negado'}), 403
-        
         secretaria = Secretaria.query.get_or_404(secretaria_id)
         secretaria.ativa = False
         
+        invalidar_snapshots()
         db.session.commit()
         
         return jsonify({'message': 'Secretaria desativada com sucesso'}), 200
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from src.services.versoes import versao_tabelas
+
+# Arquivo SQLite compartilhado por todos os workers do host
+ARQUIVO_CACHE = os.getenv(
+    'CACHE_CONSULTAS_ARQUIVO',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'cache_consultas.db')
+)
+TTL_PADRAO = int(os.getenv('CACHE_CONSULTAS_TTL', '300'))
+MAX_ITENS = int(os.getenv('CACHE_CONSULTAS_MAX_ITENS', '500'))
+# Leituras só registram o acesso (para o LRU) se o último tiver mais de N
+# segundos: acertos frequentes não disputam a trava de escrita do arquivo
+INTERVALO_ACESSO = float(os.getenv('CACHE_CONSULTAS_INTERVALO_ACESSO', '30'))
+
+# Uma conexão por processo, compartilhada entre threads/greenlets sob a trava
+# (as operações levam microssegundos; uma conexão por greenlet não escalaria)
+_trava = threading.Lock()
+_estado = {'conexao': None, 'pid': None}
+
+
+def _conexao():
+    """Conexão do processo atual (workers são criados via fork)"""
+    conexao = _estado['conexao']
+    if conexao is None or _estado['pid'] != os.getpid():
+        os.makedirs(os.path.dirname(ARQUIVO_CACHE), exist_ok=True)
+        conexao = sqlite3.connect(ARQUIVO_CACHE, timeout=5, isolation_level=None, check_same_thread=False)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' chave TEXT PRIMARY KEY,'
+            ' valor TEXT NOT NULL,'
+            ' expira_em REAL NOT NULL,'
+            ' acessado_em REAL NOT NULL)'
+        )
+        conexao.execute('CREATE INDEX IF NOT EXISTS ix_cache_acessado_em ON cache (acessado_em)')
+        _estado.update(conexao=conexao, pid=os.getpid())
+    return conexao
+
+
+def _ler(chave):
+    agora = time.time()
+    with _trava:
+        conexao = _conexao()
+        linha = conexao.execute(
+            'SELECT valor, acessado_em FROM cache WHERE chave = ? AND expira_em > ?', (chave, agora)
+        ).fetchone()
+        if linha is None:
+            return None
+        if agora - linha[1] > INTERVALO_ACESSO:
+            conexao.execute('UPDATE cache SET acessado_em = ? WHERE chave = ?', (agora, chave))
+    return json.loads(linha[0])
+
+
+def _gravar(chave, valor, ttl):
+    agora = time.time()
+    serializado = json.dumps(valor)
+    with _trava:
+        conexao = _conexao()
+        conexao.execute(
+            'INSERT OR REPLACE INTO cache (chave, valor, expira_em, acessado_em) VALUES (?, ?, ?, ?)',
+            (chave, serializado, agora + ttl, agora)
+        )
+        # Expirados saem primeiro; acima do limite, os menos acessados (LRU)
+        conexao.execute('DELETE FROM cache WHERE expira_em <= ?', (agora,))
+        conexao.execute(
+            'DELETE FROM cache WHERE chave IN ('
+            ' SELECT chave FROM cache ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)',
+            (MAX_ITENS,)
+        )
+
+
+def em_cache(nome, modelos, parametros, gerar, ttl=None):
+    """Resultado de `gerar()` reaproveitado entre requisições e workers.
+
+    A chave combina `nome`, os `parametros` e a versão das tabelas dos
+    `modelos`: qualquer escrita nessas tabelas muda a versão, e entradas
+    antigas deixam de ser lidas até saírem por TTL ou LRU. Falhas do
+    arquivo de cache não interrompem a requisição.
+    """
+    conteudo = json.dumps([nome, parametros, versao_tabelas(*modelos)], sort_keys=True, default=str)
+    chave = hashlib.sha256(conteudo.encode()).hexdigest()
+
+    try:
+        valor = _ler(chave)
+        if valor is not None:
+            return valor
+    except sqlite3.Error:
+        return gerar()
+
+    valor = gerar()
+    try:
+        _gravar(chave, valor, TTL_PADRAO if ttl is None else ttl)
+    except sqlite3.Error:
+        pass
+    return valor
+
+
+def limpar_cache():
+    """Remove todas as entradas do cache"""
+    with _trava:
+        _conexao().execute('DELETE FROM cache')
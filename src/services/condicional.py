@@ -0,0 +1,46 @@
+import hashlib
+from datetime import date
+from functools import wraps
+from flask import request, make_response
+from flask_jwt_extended import get_jwt_identity
+from src.services.versoes import versao_tabelas
+
+
+def resposta_condicional(*modelos, modelos_da_rota=None):
+    """Cria um decorador de GET condicional (ETag / If-None-Match).
+
+    A ETag combina a versão das tabelas dos `modelos`, a URL com a query
+    string, o usuário e o dia (dashboards e alertas dependem da data atual).
+    Se o cliente já tem a versão atual, responde 304 sem executar a view.
+    `modelos_da_rota` recebe os argumentos da rota e devolve os modelos, para
+    rotas em que a tabela vem da URL. Deve ser aplicado abaixo de @jwt_required().
+    """
+    def decorador(funcao):
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            tabelas = modelos_da_rota(**kwargs) if modelos_da_rota else modelos
+            if not tabelas:
+                return funcao(*args, **kwargs)
+
+            # Versão lida antes da consulta principal: se houver escrita no meio,
+            # a próxima requisição apenas recebe a resposta completa de novo
+            marcador = '|'.join([
+                versao_tabelas(*tabelas),
+                request.full_path,
+                str(get_jwt_identity()),
+                date.today().isoformat()
+            ])
+            etag = hashlib.sha1(marcador.encode()).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                resposta = make_response('', 304)
+                resposta.set_etag(etag)
+                return resposta
+
+            resposta = make_response(funcao(*args, **kwargs))
+            if resposta.status_code == 200:
+                resposta.set_etag(etag)
+                resposta.headers['Cache-Control'] = 'private, no-cache'
+            return resposta
+        return envolvida
+    return decorador
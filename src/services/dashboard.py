@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from sqlalchemy import func
+from src.models.database import db
+from src.models.secretaria import Secretaria
+from src.models.projeto import Projeto
+from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico, intervalo_ano
+
+
+def estatisticas_projetos():
+    """Contadores de projetos em uma única passada pela tabela.
+
+    Um GROUP BY por status fornece a distribuição completa; total e
+    contadores por status são derivados dela, sem novas consultas.
+    """
+    por_status = db.session.query(
+        Projeto.status,
+        func.count(Projeto.id)
+    ).group_by(Projeto.status).order_by(Projeto.status).all()
+
+    contagem = dict(por_status)
+
+    return {
+        'total_projetos': sum(contagem.values()),
+        'projetos_concluidos': contagem.get('concluido', 0),
+        'projetos_em_execucao': contagem.get('execucao', 0),
+        'projetos_atrasados': contagem.get('atrasado', 0),
+        'projetos_por_status': [
+            {'status': status, 'total': total}
+            for status, total in por_status
+        ]
+    }
+
+
+def projetos_por_secretaria():
+    """Total de projetos por secretaria (a partir dos contadores mantidos)"""
+    linhas = db.session.query(
+        Secretaria.nome,
+        Secretaria.total_projetos
+    ).filter(Secretaria.total_projetos > 0).order_by(Secretaria.id).all()
+
+    return [
+        {'secretaria': nome, 'total': total}
+        for nome, total in linhas
+    ]
+
+
+def projetos_vencendo(dias=7):
+    """Projetos em aberto com término previsto nos próximos dias (apenas colunas do alerta)"""
+    data_limite = date.today() + timedelta(days=dias)
+
+    return db.session.query(
+        Projeto.id,
+        Projeto.titulo,
+        Projeto.status,
+        Projeto.progresso,
+        Projeto.data_previsao_termino,
+        Projeto.secretaria_id
+    ).filter(
+        Projeto.data_previsao_termino <= data_limite,
+        Projeto.status.in_(['planejamento', 'execucao'])
+    ).all()
+
+
+def projetos_com_recursos_pendentes():
+    """Projetos com recursos pendentes (apenas colunas do alerta)"""
+    return db.session.query(
+        Projeto.id,
+        Projeto.titulo,
+        Projeto.recursos_pendentes
+    ).filter(
+        Projeto.recursos_pendentes > 0
+    ).all()
+
+
+def gastos_do_mes(dia):
+    """Soma das contas do mês de `dia` (igualdade sobre data_referencia)"""
+    return db.session.query(
+        func.sum(ContaPaga.valor)
+    ).filter(ContaPaga.data_referencia == dia.replace(day=1)).scalar() or 0
+
+
+def dashboard_geral():
+    """Payload do dashboard geral (/api/relatorios/dashboard-geral)"""
+    # === ESTATÍSTICAS GERAIS ===
+    total_secretarias = Secretaria.query.filter_by(ativa=True).count()
+    estatisticas = estatisticas_projetos()
+    total_projetos = estatisticas['total_projetos']
+    projetos_concluidos = estatisticas['projetos_concluidos']
+
+    # === ALERTAS ===
+    alertas = []
+
+    # Projetos próximos do vencimento (próximos 7 dias)
+    for projeto in projetos_vencendo():
+        alertas.append({
+            'tipo': 'projeto_vencendo',
+            'mensagem': f'Projeto "{projeto.titulo}" vence em breve',
+            'data': projeto.data_previsao_termino.isoformat() if projeto.data_previsao_termino else None,
+            'projeto_id': projeto.id
+        })
+
+    # Projetos com recursos pendentes
+    for projeto in projetos_com_recursos_pendentes():
+        alertas.append({
+            'tipo': 'recursos_pendentes',
+            'mensagem': f'Projeto "{projeto.titulo}" tem recursos pendentes: R$ {projeto.recursos_pendentes}',
+            'valor': float(projeto.recursos_pendentes),
+            'projeto_id': projeto.id
+        })
+
+    # === GASTOS RECENTES ===
+    gastos_mes_atual = gastos_do_mes(date.today())
+
+    # === MATERIAIS RECENTES ===
+    data_limite_materiais = date.today() - timedelta(days=30)
+    materiais_recentes = MaterialEscritorio.query.filter(
+        MaterialEscritorio.data_entrada >= data_limite_materiais
+    ).count()
+
+    return {
+        'estatisticas_gerais': {
+            'total_secretarias': total_secretarias,
+            'total_projetos': total_projetos,
+            'projetos_concluidos': projetos_concluidos,
+            'projetos_atrasados': estatisticas['projetos_atrasados'],
+            'taxa_conclusao': round((projetos_concluidos / total_projetos * 100) if total_projetos > 0 else 0, 2)
+        },
+        'projetos_por_status': estatisticas['projetos_por_status'],
+        'projetos_por_secretaria': projetos_por_secretaria(),
+        'alertas': alertas,
+        'resumo_financeiro': {
+            'gastos_mes_atual': float(gastos_mes_atual),
+            'materiais_recentes': materiais_recentes
+        }
+    }
+
+
+def dashboard_projetos():
+    """Payload do dashboard de projetos (/api/projetos/dashboard)"""
+    estatisticas = estatisticas_projetos()
+
+    return {
+        'estatisticas': {
+            'total_projetos': estatisticas['total_projetos'],
+            'projetos_concluidos': estatisticas['projetos_concluidos'],
+            'projetos_em_execucao': estatisticas['projetos_em_execucao'],
+            'projetos_atrasados': estatisticas['projetos_atrasados']
+        },
+        'projetos_por_secretaria': projetos_por_secretaria(),
+        'projetos_vencendo': [
+            {
+                'id': projeto.id,
+                'titulo': projeto.titulo,
+                'status': projeto.status,
+                'progresso': projeto.progresso,
+                'data_previsao_termino': projeto.data_previsao_termino.isoformat() if projeto.data_previsao_termino else None,
+                'secretaria_id': projeto.secretaria_id
+            }
+            for projeto in projetos_vencendo()
+        ]
+    }
+
+
+def dashboard_recursos():
+    """Payload do dashboard de recursos (/api/recursos/dashboard)"""
+    # Gastos por tipo de conta no ano atual
+    ano_atual = date.today().year
+    gastos_por_tipo = db.session.query(
+        ContaPaga.tipo_conta,
+        func.sum(ContaPaga.valor).label('total')
+    ).filter(
+        intervalo_ano(ano_atual)
+    ).group_by(ContaPaga.tipo_conta).all()
+
+    # Total de gastos no mês atual
+    gastos_mes_atual = gastos_do_mes(date.today())
+
+    # Materiais recebidos nos últimos 30 dias
+    data_limite = date.today() - timedelta(days=30)
+    materiais_recentes = MaterialEscritorio.query.filter(
+        MaterialEscritorio.data_entrada >= data_limite
+    ).count()
+
+    # Recursos estratégicos por status
+    recursos_por_status = db.session.query(
+        RecursoEstrategico.status,
+        func.count(RecursoEstrategico.id).label('total')
+    ).group_by(RecursoEstrategico.status).all()
+
+    return {
+        'gastos_por_tipo': [
+            {'tipo': tipo, 'total': float(total)}
+            for tipo, total in gastos_por_tipo
+        ],
+        'gastos_mes_atual': float(gastos_mes_atual),
+        'materiais_recentes': materiais_recentes,
+        'recursos_por_status': [
+            {'status': status, 'total': total}
+            for status, total in recursos_por_status
+        ]
+    }
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from src.models.database import db
+from src.models.projeto import Projeto
+from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+
+# Tabelas disponíveis para exportação (nome na URL -> modelo)
+EXPORTAVEIS = {
+    'contas': ContaPaga,
+    'projetos': Projeto,
+    'materiais': MaterialEscritorio,
+    'estrategicos': RecursoEstrategico
+}
+
+FORMATOS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+TAMANHO_LOTE = 1000
+
+
+def _valor(valor):
+    """Converte valores de coluna para tipos serializáveis"""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def _colunas(modelo):
+    """Colunas exportadas: as da tabela, menos os campos_excluidos do modelo"""
+    excluidos = set(getattr(modelo, 'campos_excluidos', ()))
+    return [coluna for coluna in modelo.__table__.columns if coluna.key not in excluidos]
+
+
+def _lotes(modelo, tamanho_lote):
+    """Percorre a tabela em lotes usando cursor do lado do servidor (yield_per)"""
+    colunas = _colunas(modelo)
+    resultado = db.session.execute(
+        select(*colunas)
+        .order_by(modelo.id)
+        .execution_options(yield_per=tamanho_lote)
+    )
+    try:
+        for lote in resultado.partitions():
+            yield lote
+    finally:
+        resultado.close()
+
+
+def exportar(modelo, formato, tamanho_lote=TAMANHO_LOTE):
+    """Gera o conteúdo da exportação em blocos de texto, um por lote de linhas.
+
+    Apenas um lote fica em memória por vez, independente do tamanho da tabela.
+    """
+    nomes = [coluna.key for coluna in _colunas(modelo)]
+
+    if formato == 'csv':
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(nomes)
+        yield buffer.getvalue()
+
+        for lote in _lotes(modelo, tamanho_lote):
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows([[_valor(v) for v in linha] for linha in lote])
+            yield buffer.getvalue()
+    else:
+        for lote in _lotes(modelo, tamanho_lote):
+            yield ''.join(
+                json.dumps(dict(zip(nomes, map(_valor, linha))), ensure_ascii=False) + '\n'
+                for linha in lote
+            )
@@ -0,0 +1,339 @@
+import csv
+import io
+import itertools
+import math
+import random
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from src.models.database import db
+from src.models.usuario import Usuario
+from src.models.secretaria import Secretaria
+from src.models.projeto import Projeto
+from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+from src.models.contadores import reconciliar_contadores
+from src.models.versoes_tabelas import incrementar_versoes
+from src.services.snapshots import invalidar_snapshots
+
+# Linhas por bloco enviado ao banco (por COPY no PostgreSQL)
+LINHAS_POR_BLOCO = 50000
+# Limite de parâmetros por comando do SQLite (999 antes da versão 3.32)
+PARAMETROS_SQLITE = 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+
+# Data final padrão dos dados; fixa para que a mesma semente gere sempre o mesmo banco
+REFERENCIA_PADRAO = date(2025, 6, 30)
+
+# Mesmos usuários do populate_db.py
+USUARIOS = [
+    ('Administrador', 'admin@secretaria.gov.br', 'administrador', 'admin123'),
+    ('João Silva', 'joao@secretaria.gov.br', 'colaborador', 'colaborador123'),
+    ('Maria Santos', 'maria@secretaria.gov.br', 'visualizador', 'visualizador123')
+]
+
+AREAS = [
+    'Educação', 'Saúde', 'Obras', 'Meio Ambiente', 'Cultura', 'Esporte e Lazer',
+    'Assistência Social', 'Fazenda', 'Transporte', 'Habitação', 'Segurança',
+    'Agricultura', 'Turismo', 'Planejamento', 'Administração'
+]
+NOMES = ['Ana', 'Carlos', 'Roberto', 'Fernanda', 'Paulo', 'Juliana', 'Marcos', 'Patrícia', 'Lucas', 'Beatriz']
+SOBRENOMES = ['Costa', 'Mendes', 'Lima', 'Oliveira', 'Souza', 'Pereira', 'Almeida', 'Ribeiro', 'Carvalho', 'Gomes']
+
+ACOES = ['Reforma', 'Ampliação', 'Implantação', 'Modernização', 'Digitalização', 'Capacitação', 'Manutenção']
+OBJETOS = [
+    'da Escola Municipal', 'do Posto de Saúde', 'da Praça Central', 'do Sistema de Protocolo',
+    'da Iluminação Pública', 'do Centro Cultural', 'da Frota Municipal', 'da Biblioteca'
+]
+
+# Status -> (probabilidade, faixa de progresso)
+STATUS_PROJETO = {
+    'planejamento': (0.20, (0, 10)),
+    'execucao': (0.45, (10, 95)),
+    'concluido': (0.25, (100, 100)),
+    'atrasado': (0.10, (20, 90))
+}
+
+# Tipo de conta -> valor médio mensal; energia e água variam com a estação
+TIPOS_CONTA = {
+    'energia': 2500.0, 'agua': 800.0, 'internet': 450.0, 'telefone': 320.0,
+    'gas': 180.0, 'limpeza': 3200.0, 'seguranca': 5400.0, 'aluguel': 7000.0
+}
+SAZONAIS = {'energia': 0.25, 'agua': 0.15}
+
+# Material -> (unidade, faixa de valor unitário)
+MATERIAIS = {
+    'Papel A4': ('resma', (22, 32)), 'Canetas Esferográficas': ('unidade', (1.5, 3.5)),
+    'Copos Descartáveis': ('pacote', (6, 11)), 'Toner': ('unidade', (180, 420)),
+    'Grampos': ('caixa', (4, 9)), 'Pastas Suspensas': ('unidade', (2, 5)),
+    'Envelopes': ('pacote', (12, 25)), 'Café': ('pacote', (14, 28))
+}
+FORNECEDORES = [
+    'Papelaria Central', 'Material de Escritório Ltda', 'Distribuidora Hygiene',
+    'TechSolutions Ltda', 'Comercial Aliança', 'MedEquip Hospitalar'
+]
+
+# Recurso -> (faixa de valor por unidade, faixa de quantidade)
+RECURSOS = {
+    'Computadores Desktop': ((2800, 4500), (5, 40)), 'Notebooks': ((3500, 6000), (2, 20)),
+    'Veículo Utilitário': ((80000, 140000), (1, 3)), 'Equipamentos Médicos': ((15000, 60000), (1, 4)),
+    'Mobiliário Escolar': ((300, 900), (20, 200)), 'Impressoras': ((900, 2500), (2, 10))
+}
+STATUS_RECURSO = ['recebido', 'em_uso', 'em_uso', 'finalizado']
+
+
+def _meses(inicio, fim):
+    """Primeiros dias dos meses de `inicio` até `fim` (inclusive)"""
+    mes = inicio.replace(day=1)
+    while mes <= fim:
+        yield mes
+        mes = (mes + timedelta(days=32)).replace(day=1)
+
+
+def _instante(dia):
+    return datetime.combine(dia, time(9))
+
+
+def _valor(aleatorio, media, dispersao=0.6):
+    """Valor monetário com distribuição log-normal de média `media`"""
+    return round(aleatorio.lognormvariate(math.log(media) - dispersao ** 2 / 2, dispersao), 2)
+
+
+def _dia_aleatorio(aleatorio, inicio, fim):
+    return inicio + timedelta(days=aleatorio.randint(0, max(0, (fim - inicio).days)))
+
+
+def _secretarias(aleatorio, quantidade, referencia):
+    for numero in range(quantidade):
+        area = AREAS[numero % len(AREAS)]
+        regional = numero // len(AREAS)
+        responsavel = f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}'
+        yield {
+            'nome': f'Secretaria de {area}' + (f' - Regional {regional}' if regional else ''),
+            'responsavel': responsavel,
+            'contato': f'{responsavel.split()[0].lower()}.{numero}@prefeitura.gov.br',
+            'email': f'secretaria{numero}@gov.br',
+            'telefone': f'(11) 3{aleatorio.randint(100, 999)}-{aleatorio.randint(1000, 9999)}',
+            'ativa': aleatorio.random() >= 0.05,
+            'created_at': _instante(referencia),
+            'updated_at': _instante(referencia)
+        }
+
+
+def _projetos(aleatorio, secretaria_ids, media, inicio, referencia):
+    """Quantidade por secretaria com cauda longa (poucas secretarias concentram projetos)"""
+    status = list(STATUS_PROJETO)
+    pesos = [probabilidade for probabilidade, _ in STATUS_PROJETO.values()]
+
+    for secretaria_id in secretaria_ids:
+        quantidade = int(round(aleatorio.lognormvariate(math.log(max(media, 1)) - 0.32, 0.8))) if media else 0
+        for _ in range(quantidade):
+            situacao = aleatorio.choices(status, pesos)[0]
+            data_inicio = _dia_aleatorio(aleatorio, inicio, referencia)
+            previsao = data_inicio + timedelta(days=aleatorio.randint(90, 720))
+            if situacao == 'atrasado' and previsao >= referencia:
+                previsao = _dia_aleatorio(aleatorio, data_inicio, referencia - timedelta(days=1))
+            aplicados = _valor(aleatorio, 60000, 1.0)
+            yield {
+                'titulo': f'{aleatorio.choice(ACOES)} {aleatorio.choice(OBJETOS)}',
+                'descricao': None,
+                'status': situacao,
+                'data_inicio': data_inicio,
+                'data_previsao_termino': previsao,
+                'data_termino_real': min(previsao, referencia) if situacao == 'concluido' else None,
+                'progresso': aleatorio.randint(*STATUS_PROJETO[situacao][1]),
+                'recursos_aplicados': aplicados,
+                # Concluídos não têm pendências; nos demais, cerca de 40% estão quitados
+                'recursos_pendentes': (
+                    round(aplicados * aleatorio.uniform(0.05, 0.6), 2)
+                    if situacao != 'concluido' and aleatorio.random() >= 0.4 else 0
+                ),
+                'observacoes': None,
+                'secretaria_id': secretaria_id,
+                'created_at': _instante(data_inicio),
+                'updated_at': _instante(data_inicio)
+            }
+
+
+def _contas(aleatorio, inicio, referencia):
+    """Uma conta por tipo e mês (chave natural de ContaPaga)"""
+    for mes in _meses(inicio, referencia - timedelta(days=1)):
+        for tipo, media in TIPOS_CONTA.items():
+            sazonal = 1 + SAZONAIS.get(tipo, 0) * math.cos((mes.month - 1) / 12 * 2 * math.pi)
+            pagamento = (mes + timedelta(days=32)).replace(day=aleatorio.randint(1, 20))
+            yield {
+                'tipo_conta': tipo,
+                'mes_referencia': mes.strftime('%Y-%m'),
+                'data_referencia': mes,
+                'valor': round(media * sazonal * aleatorio.uniform(0.85, 1.15), 2),
+                'data_pagamento': pagamento,
+                'arquivo_comprovante': None,
+                'observacoes': None,
+                'created_at': _instante(pagamento),
+                'updated_at': _instante(pagamento)
+            }
+
+
+def _materiais(aleatorio, por_mes, inicio, referencia):
+    nomes = list(MATERIAIS)
+    for mes in _meses(inicio, referencia):
+        fim_mes = min((mes + timedelta(days=32)).replace(day=1) - timedelta(days=1), referencia)
+        for _ in range(aleatorio.randint(por_mes // 2, por_mes * 3 // 2) if por_mes else 0):
+            nome = aleatorio.choice(nomes)
+            unidade, (minimo, maximo) = MATERIAIS[nome]
+            entrada = _dia_aleatorio(aleatorio, mes, fim_mes)
+            yield {
+                'nome': nome,
+                'descricao': None,
+                'quantidade': max(1, int(aleatorio.expovariate(1 / 30))),
+                'unidade': unidade,
+                'fornecedor': aleatorio.choice(FORNECEDORES),
+                'data_entrada': entrada,
+                'valor_unitario': round(aleatorio.uniform(minimo, maximo), 2),
+                'created_at': _instante(entrada),
+                'updated_at': _instante(entrada)
+            }
+
+
+def _recursos(aleatorio, por_mes, inicio, referencia):
+    nomes = list(RECURSOS)
+    for mes in _meses(inicio, referencia):
+        fim_mes = min((mes + timedelta(days=32)).replace(day=1) - timedelta(days=1), referencia)
+        for _ in range(aleatorio.randint(por_mes // 2, por_mes * 3 // 2) if por_mes else 0):
+            nome = aleatorio.choice(nomes)
+            (minimo, maximo), faixa_quantidade = RECURSOS[nome]
+            quantidade = aleatorio.randint(*faixa_quantidade)
+            chegada = _dia_aleatorio(aleatorio, mes, fim_mes)
+            yield {
+                'nome': nome,
+                'descricao': f'{nome} para {aleatorio.choice(AREAS).lower()}',
+                'quantidade': quantidade,
+                'data_chegada': chegada,
+                'destino_uso': f'Secretaria de {aleatorio.choice(AREAS)}',
+                'fornecedor': aleatorio.choice(FORNECEDORES),
+                'valor': round(quantidade * aleatorio.uniform(minimo, maximo), 2),
+                'status': aleatorio.choice(STATUS_RECURSO),
+                'created_at': _instante(chegada),
+                'updated_at': _instante(chegada)
+            }
+
+
+def _blocos(linhas, tamanho):
+    linhas = iter(linhas)
+    while True:
+        bloco = list(itertools.islice(linhas, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def _copiar(tabela, linhas):
+    """COPY ... FROM STDIN (psycopg2) em blocos de LINHAS_POR_BLOCO linhas"""
+    preparador = db.engine.dialect.identifier_preparer
+    conexao = db.session.connection().connection.driver_connection
+    total = 0
+
+    with conexao.cursor() as cursor:
+        for bloco in _blocos(linhas, LINHAS_POR_BLOCO):
+            colunas = list(bloco[0])
+            buffer = io.StringIO()
+            # Em CSV, campo vazio sem aspas é NULL (os geradores não produzem texto vazio)
+            csv.writer(buffer).writerows([linha[coluna] for coluna in colunas] for linha in bloco)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY {preparador.format_table(tabela)} '
+                f'({", ".join(preparador.quote(coluna) for coluna in colunas)}) FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            total += len(bloco)
+    return total
+
+
+def _inserir_multiplas(tabela, linhas):
+    """INSERT com várias linhas por comando, até o limite de parâmetros do SQLite.
+
+    O SQL é montado uma vez por tamanho de comando e executado direto no
+    driver (compilar milhares de VALUES pelo SQLAlchemy custa mais que a
+    gravação); os bind processors das colunas mantêm o formato que o ORM grava.
+    """
+    preparador = db.engine.dialect.identifier_preparer
+    conexao = db.session.connection()
+    comandos = {}
+    total = 0
+
+    for bloco in _blocos(linhas, LINHAS_POR_BLOCO):
+        colunas = list(bloco[0])
+        processadores = [tabela.c[coluna].type.bind_processor(db.engine.dialect) for coluna in colunas]
+        por_comando = max(1, PARAMETROS_SQLITE // len(colunas))
+
+        for inicio in range(0, len(bloco), por_comando):
+            trecho = bloco[inicio:inicio + por_comando]
+            chave = (tuple(colunas), len(trecho))
+            if chave not in comandos:
+                comandos[chave] = (
+                    f'INSERT INTO {preparador.format_table(tabela)} '
+                    f'({", ".join(preparador.quote(coluna) for coluna in colunas)}) VALUES '
+                    + ', '.join(['(' + ', '.join('?' * len(colunas)) + ')'] * len(trecho))
+                )
+            parametros = tuple(
+                processar(linha[coluna]) if processar else linha[coluna]
+                for linha in trecho
+                for coluna, processar in zip(colunas, processadores)
+            )
+            conexao.exec_driver_sql(comandos[chave], parametros)
+        total += len(bloco)
+    return total
+
+
+def _carregar(modelo, linhas):
+    """Grava as linhas pelo caminho de carga mais rápido do banco; retorna quantas"""
+    if db.engine.dialect.name == 'postgresql':
+        total = _copiar(modelo.__table__, linhas)
+    else:
+        total = _inserir_multiplas(modelo.__table__, linhas)
+    db.session.commit()
+    return total
+
+
+def gerar_dados(secretarias=50, projetos_por_secretaria=40, anos=5, materiais_por_mes=30,
+                recursos_por_mes=8, semente=42, referencia=REFERENCIA_PADRAO, informar=print):
+    """Popula um banco vazio com dados sintéticos em escala de produção.
+
+    Os mesmos parâmetros, `semente` e `referencia` (data final dos dados)
+    geram exatamente os mesmos registros. Projetos têm quantidade por
+    secretaria com cauda longa e status, prazos e valores coerentes entre
+    si; há uma conta por tipo e mês ao longo de `anos`.
+    Os contadores das secretarias são reconciliados ao final.
+    """
+    inicio = date(referencia.year - anos, referencia.month, 1)
+    aleatorio = random.Random(semente)
+
+    if db.session.query(Secretaria.id).first() is not None:
+        raise ValueError('O banco já possui secretarias; gere os dados em um banco vazio')
+
+    if db.session.query(Usuario.id).first() is None:
+        for nome, email, nivel_acesso, senha in USUARIOS:
+            usuario = Usuario(nome=nome, email=email, nivel_acesso=nivel_acesso)
+            usuario.set_senha(senha)
+            db.session.add(usuario)
+        db.session.commit()
+
+    totais = {'secretarias': _carregar(Secretaria, _secretarias(aleatorio, secretarias, referencia))}
+    informar(f"{totais['secretarias']} secretarias")
+
+    secretaria_ids = db.session.execute(select(Secretaria.id).order_by(Secretaria.id)).scalars().all()
+    etapas = [
+        ('projetos', Projeto, _projetos(aleatorio, secretaria_ids, projetos_por_secretaria, inicio, referencia)),
+        ('contas', ContaPaga, _contas(aleatorio, inicio, referencia)),
+        ('materiais', MaterialEscritorio, _materiais(aleatorio, materiais_por_mes, inicio, referencia)),
+        ('recursos', RecursoEstrategico, _recursos(aleatorio, recursos_por_mes, inicio, referencia))
+    ]
+    for nome, modelo, linhas in etapas:
+        totais[nome] = _carregar(modelo, linhas)
+        informar(f'{totais[nome]} {nome}')
+
+    # Cargas em massa não passam pelos eventos que mantêm os contadores
+    # nem pelos que registram a versão das tabelas
+    reconciliar_contadores()
+    invalidar_snapshots()
+    incrementar_versoes(db.session.connection(), [modelo.__tablename__ for _, modelo, _ in etapas] + ['secretarias'])
+    db.session.commit()
+    return totais
@@ -0,0 +1,133 @@
+import csv
+import itertools
+import os
+from sqlalchemy import insert
+from src.models.database import db
+from src.models.recursos import ContaPaga, MaterialEscritorio
+from src.services import lote
+from src.services.snapshots import invalidar_snapshots
+
+TAMANHO_LOTE = int(os.getenv('IMPORTACAO_TAMANHO_LOTE', '1000'))
+# Erros de linha reportados individualmente; além disso, apenas contados
+ERROS_DETALHADOS = int(os.getenv('IMPORTACAO_ERROS_DETALHADOS', '1000'))
+
+# Tabela -> (modelo, conversor de linha, colunas obrigatórias, colunas decimais)
+IMPORTAVEIS = {
+    'contas': (
+        ContaPaga, lote.converter_conta,
+        ('tipo_conta', 'mes_referencia', 'valor', 'data_pagamento'), ('valor',)
+    ),
+    'materiais': (
+        MaterialEscritorio, lote.converter_material,
+        ('nome', 'quantidade', 'data_entrada'), ('valor_unitario',)
+    )
+}
+
+
+def _decimal(valor):
+    """Aceita 1234.56 e o formato das planilhas brasileiras (1.234,56)"""
+    if ',' in valor:
+        return valor.replace('.', '').replace(',', '.')
+    return valor
+
+
+def _normalizar(linha, decimais):
+    """Células vazias viram None e decimais são normalizados antes da conversão"""
+    item = {}
+    for campo, valor in linha.items():
+        if campo is None:
+            continue  # colunas excedentes na linha
+        valor = (valor or '').strip()
+        if not valor:
+            continue
+        item[campo.strip()] = _decimal(valor) if campo.strip() in decimais else valor
+    return item
+
+
+def _gravar(modelo, valores):
+    """Grava um bloco em sua própria transação.
+
+    Modelos com chave natural são gravados por upsert: reimportar o mesmo
+    arquivo (por exemplo, após uma falha no meio) atualiza em vez de duplicar.
+    """
+    chave = getattr(modelo, 'chave_natural', None)
+    if chave:
+        # Dentro do bloco, a última linha de cada chave prevalece
+        valores = list({tuple(linha[campo] for campo in chave): linha for linha in valores}.values())
+        db.session.execute(lote.insert_ou_atualizar(modelo), valores)
+    else:
+        db.session.execute(insert(modelo.__table__), valores)
+    invalidar_snapshots()
+    db.session.commit()
+
+
+def importar_csv(tabela, arquivo):
+    """Importa um CSV (arquivo de texto) em blocos, gerando eventos de andamento.
+
+    O cabeçalho é conferido de imediato (ValueError se faltar coluna). Depois
+    o arquivo é lido linha a linha e cada bloco de TAMANHO_LOTE linhas
+    válidas é gravado em uma transação, de modo que a memória não depende do
+    tamanho do arquivo. Eventos: {'tipo': 'erro', 'linha', 'erro'} por linha
+    rejeitada, {'tipo': 'progresso', ...} a cada bloco e {'tipo': 'fim', ...}.
+    Um trecho ilegível (encoding errado, CSV malformado) encerra a leitura
+    com um evento de erro, seguido do 'fim' com os totais.
+    """
+    modelo, converter, obrigatorias, decimais = IMPORTAVEIS[tabela]
+
+    # Planilhas exportadas em pt-BR costumam usar ';' como separador
+    cabecalho = arquivo.readline()
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    leitor = csv.DictReader(itertools.chain([cabecalho], arquivo), delimiter=separador)
+    colunas = {coluna.strip() for coluna in leitor.fieldnames or []}
+    faltando = [coluna for coluna in obrigatorias if coluna not in colunas]
+    if faltando:
+        raise ValueError(f'Colunas obrigatórias ausentes no CSV: {", ".join(faltando)}')
+
+    return _importar(modelo, converter, decimais, leitor)
+
+
+def _importar(modelo, converter, decimais, leitor):
+    totais = {'linhas': 0, 'inseridos': 0, 'erros': 0}
+    bloco = []
+
+    def gravar_bloco():
+        try:
+            _gravar(modelo, [valores for _, valores in bloco])
+            totais['inseridos'] += len(bloco)
+            return []
+        except Exception as e:
+            db.session.rollback()
+            totais['erros'] += len(bloco)
+            return [{'tipo': 'erro', 'linha': bloco[0][0], 'ate_linha': bloco[-1][0], 'erro': str(e)}]
+
+    numero = 1  # linha 1 é o cabeçalho
+    linhas = iter(leitor)
+    while True:
+        try:
+            linha = next(linhas, None)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Arquivo ilegível daqui em diante: grava o que já foi lido e encerra
+            totais['erros'] += 1
+            yield {'tipo': 'erro', 'linha': numero + 1, 'erro': f'Leitura do arquivo interrompida: {e}'}
+            break
+        if linha is None:
+            break
+
+        numero += 1
+        totais['linhas'] += 1
+        try:
+            bloco.append((numero, converter(_normalizar(linha, decimais))))
+        except ValueError as e:
+            totais['erros'] += 1
+            if totais['erros'] <= ERROS_DETALHADOS:
+                yield {'tipo': 'erro', 'linha': numero, 'erro': str(e)}
+
+        if len(bloco) >= TAMANHO_LOTE:
+            yield from gravar_bloco()
+            bloco = []
+            yield {'tipo': 'progresso', **totais}
+
+    if bloco:
+        yield from gravar_bloco()
+
+    yield {'tipo': 'fim', **totais}
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from src.services import relatorios as relatorios_service
+from src.services.versoes import versao_tabelas
+from src.models.replica import leituras_na_replica
+
+# Diretório compartilhado entre os workers: estado dos jobs e resultados
+DIRETORIO_JOBS = os.getenv(
+    'RELATORIO_JOBS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'relatorios')
+)
+MAX_WORKERS = int(os.getenv('RELATORIO_JOBS_WORKERS', '2'))
+RETENCAO_SEGUNDOS = int(os.getenv('RELATORIO_JOBS_RETENCAO', str(24 * 3600)))
+# Jobs pendentes ou em execução há mais tempo que isso são dados como
+# perdidos (worker reiniciado ou encerrado no meio da execução)
+TEMPO_MAXIMO_SEGUNDOS = int(os.getenv('RELATORIO_JOBS_TEMPO_MAXIMO', str(30 * 60)))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='relatorio-job')
+
+
+def _caminho(nome):
+    return os.path.join(DIRETORIO_JOBS, nome)
+
+
+def _gravar_json(nome, dados):
+    """Grava o arquivo de forma atômica (arquivo temporário + rename)"""
+    os.makedirs(DIRETORIO_JOBS, exist_ok=True)
+    temporario = _caminho(f'.{nome}.{uuid.uuid4().hex}.tmp')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+    os.replace(temporario, _caminho(nome))
+
+
+def _atualizar_job(job, **campos):
+    job.update(campos)
+    _gravar_json(f'job-{job["id"]}.json', job)
+
+
+def obter_job(job_id):
+    """Estado do job, ou None se não existir.
+
+    Um job parado em 'pendente' ou 'executando' além de TEMPO_MAXIMO_SEGUNDOS
+    é marcado como erro: o worker que o executava não existe mais.
+    """
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_caminho(f'job-{job_id}.json'), encoding='utf-8') as arquivo:
+            job = json.load(arquivo)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if job['status'] in ('pendente', 'executando'):
+        inicio = datetime.fromisoformat(job.get('iniciado_em') or job['criado_em'])
+        if (datetime.utcnow() - inicio).total_seconds() > TEMPO_MAXIMO_SEGUNDOS:
+            _atualizar_job(job, status='erro', erro='Job interrompido: tempo máximo de execução excedido',
+                           concluido_em=datetime.utcnow().isoformat())
+    return job
+
+
+def caminho_resultado(job):
+    """Arquivo com o resultado do job concluído"""
+    return _caminho(f'resultado-{job["chave"]}.json')
+
+
+def _chave_resultado(tipo, parametros):
+    """Chave do resultado: tipo, parâmetros e versão das tabelas envolvidas.
+
+    Quando alguma das tabelas muda, a versão muda e o resultado antigo
+    deixa de ser reaproveitado.
+    """
+    versao = versao_tabelas(*relatorios_service.TABELAS_RELATORIO[tipo])
+    conteudo = json.dumps([tipo, parametros, versao], sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def _limpar_antigos():
+    """Remove jobs e resultados mais antigos que a retenção configurada"""
+    if not os.path.isdir(DIRETORIO_JOBS):
+        return
+    limite = time.time() - RETENCAO_SEGUNDOS
+    for nome in os.listdir(DIRETORIO_JOBS):
+        caminho = _caminho(nome)
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except OSError:
+            pass
+
+
+def _executar(app, job):
+    """Executa o relatório fora do ciclo de requisição e grava o resultado"""
+    with app.app_context():
+        leituras_na_replica()
+        try:
+            _atualizar_job(job, status='executando', iniciado_em=datetime.utcnow().isoformat())
+            payload = relatorios_service.gerar_relatorio(job['tipo'], job['parametros'])
+            _gravar_json(f'resultado-{job["chave"]}.json', payload)
+            _atualizar_job(job, status='concluido', concluido_em=datetime.utcnow().isoformat())
+        except Exception as e:
+            _atualizar_job(job, status='erro', erro=str(e), concluido_em=datetime.utcnow().isoformat())
+
+
+def criar_job(app, tipo, parametros):
+    """Registra um job de relatório e o envia ao pool de execução.
+
+    Se já existe resultado para os mesmos parâmetros e a mesma versão das
+    tabelas, o job nasce concluído e reaproveita o arquivo existente.
+    """
+    # Parâmetros inválidos são recusados aqui (ValueError), não no worker
+    parametros = relatorios_service.normalizar_parametros(tipo, parametros)
+
+    _limpar_antigos()
+
+    agora = datetime.utcnow().isoformat()
+    job = {
+        'id': uuid.uuid4().hex,
+        'tipo': tipo,
+        'parametros': parametros,
+        'chave': _chave_resultado(tipo, parametros),
+        'status': 'pendente',
+        'criado_em': agora,
+        'iniciado_em': None,
+        'concluido_em': None,
+        'erro': None,
+        'reutilizado': False
+    }
+
+    if os.path.exists(caminho_resultado(job)):
+        _atualizar_job(job, status='concluido', concluido_em=agora, reutilizado=True)
+        return job
+
+    _atualizar_job(job)
+    _executor.submit(_executar, app, dict(job))
+    return job
@@ -0,0 +1,193 @@
+import os
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.database import db
+from src.models.secretaria import Secretaria
+from src.models.recursos import primeiro_dia_mes
+
+# Quantidade máxima de registros aceitos em uma requisição de lote
+LOTE_MAXIMO = int(os.getenv('LOTE_MAXIMO', '1000'))
+
+
+class LoteInvalido(ValueError):
+    """Corpo da requisição de lote malformado (não é uma lista, vazio ou grande demais)"""
+
+
+def _obrigatorios(item, campos):
+    if not isinstance(item, dict) or not all(campo in item for campo in campos):
+        raise ValueError(f'Dados obrigatórios: {", ".join(campos)}')
+
+
+def _data(valor, campo):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} deve estar no formato YYYY-MM-DD')
+
+
+def _numero(valor, campo, tipo=float):
+    try:
+        return tipo(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} deve ser numérico')
+
+
+# Conversores: um item do JSON -> valores de todas as colunas do insert (as
+# mesmas regras dos endpoints de criação individual). Todas as chaves estão
+# sempre presentes para que o lote vá em um único executemany.
+
+def converter_conta(item):
+    _obrigatorios(item, ['tipo_conta', 'mes_referencia', 'valor', 'data_pagamento'])
+    return {
+        'tipo_conta': item['tipo_conta'],
+        'mes_referencia': item['mes_referencia'],
+        'data_referencia': primeiro_dia_mes(item['mes_referencia']),
+        'valor': _numero(item['valor'], 'valor'),
+        'data_pagamento': _data(item['data_pagamento'], 'data_pagamento'),
+        'arquivo_comprovante': item.get('arquivo_comprovante'),
+        'observacoes': item.get('observacoes')
+    }
+
+
+def converter_material(item):
+    _obrigatorios(item, ['nome', 'quantidade', 'data_entrada'])
+    return {
+        'nome': item['nome'],
+        'descricao': item.get('descricao'),
+        'quantidade': _numero(item['quantidade'], 'quantidade', int),
+        'unidade': item.get('unidade'),
+        'fornecedor': item.get('fornecedor'),
+        'data_entrada': _data(item['data_entrada'], 'data_entrada'),
+        'valor_unitario': _numero(item['valor_unitario'], 'valor_unitario') if item.get('valor_unitario') else None
+    }
+
+
+def converter_recurso(item):
+    _obrigatorios(item, ['nome', 'descricao', 'quantidade', 'data_chegada'])
+    return {
+        'nome': item['nome'],
+        'descricao': item['descricao'],
+        'quantidade': _numero(item['quantidade'], 'quantidade', int),
+        'data_chegada': _data(item['data_chegada'], 'data_chegada'),
+        'destino_uso': item.get('destino_uso'),
+        'fornecedor': item.get('fornecedor'),
+        'valor': _numero(item['valor'], 'valor') if item.get('valor') else None,
+        'status': item.get('status', 'recebido')
+    }
+
+
+def converter_projeto(item):
+    _obrigatorios(item, ['titulo', 'secretaria_id'])
+    return {
+        'titulo': item['titulo'],
+        'descricao': item.get('descricao'),
+        'status': item.get('status', 'planejamento'),
+        'secretaria_id': _numero(item['secretaria_id'], 'secretaria_id', int),
+        'data_inicio': _data(item['data_inicio'], 'data_inicio') if item.get('data_inicio') else None,
+        'data_previsao_termino': (
+            _data(item['data_previsao_termino'], 'data_previsao_termino')
+            if item.get('data_previsao_termino') else None
+        ),
+        'progresso': max(0, min(100, _numero(item['progresso'], 'progresso', int))) if item.get('progresso') else 0,
+        'recursos_aplicados': _numero(item['recursos_aplicados'], 'recursos_aplicados') if item.get('recursos_aplicados') else 0,
+        'recursos_pendentes': _numero(item['recursos_pendentes'], 'recursos_pendentes') if item.get('recursos_pendentes') else 0,
+        'observacoes': item.get('observacoes') or None
+    }
+
+
+def validar_secretarias(validos, erros):
+    """Move para `erros` os projetos cuja secretaria não existe (uma consulta para o lote)"""
+    ids = {valores['secretaria_id'] for _, valores in validos}
+    existentes = {id for (id,) in db.session.query(Secretaria.id).filter(Secretaria.id.in_(ids))} if ids else set()
+
+    for indice, valores in list(validos):
+        if valores['secretaria_id'] not in existentes:
+            erros.append({'indice': indice, 'erro': 'Secretaria não encontrada'})
+            validos.remove((indice, valores))
+
+
+def insert_ou_atualizar(modelo):
+    """INSERT ... ON CONFLICT (chave_natural) DO UPDATE para o modelo.
+
+    Uma linha com a chave natural de um registro existente substitui os
+    valores dele (menos id e created_at) em vez de duplicá-lo. SQLite e
+    PostgreSQL usam a mesma sintaxe; o índice único da chave precisa existir.
+    """
+    dialetos = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+    nome_dialeto = db.engine.dialect.name
+    if nome_dialeto not in dialetos:
+        raise ValueError(f'Upsert por chave natural não suportado no banco {nome_dialeto}')
+
+    tabela = modelo.__table__
+    comando = dialetos[nome_dialeto](tabela)
+    preservadas = {'id', 'created_at', *modelo.chave_natural}
+    return comando.on_conflict_do_update(
+        index_elements=list(modelo.chave_natural),
+        set_={coluna.name: comando.excluded[coluna.name] for coluna in tabela.columns if coluna.name not in preservadas}
+    )
+
+
+def _gravar_por_chave(modelo, validos):
+    """Upsert dos válidos; itens com a mesma chave recebem o id do mesmo registro"""
+    chave = modelo.chave_natural
+    # No PostgreSQL um comando não pode atualizar a mesma linha duas vezes:
+    # entre itens repetidos no lote vale o último
+    por_chave = {tuple(valores[campo] for campo in chave): valores for _, valores in validos}
+
+    tabela = modelo.__table__
+    linhas = db.session.execute(
+        insert_ou_atualizar(modelo).returning(tabela.c.id, *(tabela.c[campo] for campo in chave)),
+        list(por_chave.values())
+    ).all()
+    ids = {tuple(linha[1:]): linha[0] for linha in linhas}
+
+    resultados = [
+        {'indice': indice, 'id': ids[tuple(valores[campo] for campo in chave)]}
+        for indice, valores in validos
+    ]
+    return resultados, list(por_chave.values())
+
+
+def inserir_lote(modelo, itens, converter, parcial=False, validar=None):
+    """Valida o lote inteiro e insere os válidos com um único executemany.
+
+    Sem `parcial`, qualquer item inválido impede a inserção de todo o lote.
+    Modelos com `chave_natural` são gravados por upsert, de modo que reenviar
+    o mesmo lote não duplica registros. Retorna (resultados, gravados): um
+    resultado por item, na ordem recebida ({'indice', 'id'} ou
+    {'indice', 'erro'}), e os valores das linhas gravadas. Não faz commit.
+    """
+    if not isinstance(itens, list) or not itens:
+        raise LoteInvalido('Envie uma lista não vazia de registros')
+    if len(itens) > LOTE_MAXIMO:
+        raise LoteInvalido(f'Máximo de {LOTE_MAXIMO} registros por lote')
+
+    validos = []
+    erros = []
+    for indice, item in enumerate(itens):
+        try:
+            validos.append((indice, converter(item)))
+        except ValueError as e:
+            erros.append({'indice': indice, 'erro': str(e)})
+
+    if validar and validos:
+        validar(validos, erros)
+
+    if erros and not parcial:
+        return sorted(erros, key=lambda resultado: resultado['indice']), []
+
+    if validos and getattr(modelo, 'chave_natural', None):
+        gravados, valores = _gravar_por_chave(modelo, validos)
+        return sorted(erros + gravados, key=lambda resultado: resultado['indice']), valores
+
+    resultados = list(erros)
+    if validos:
+        tabela = modelo.__table__
+        ids = db.session.execute(
+            insert(tabela).returning(tabela.c.id, sort_by_parameter_order=True),
+            [valores for _, valores in validos]
+        ).scalars().all()
+        resultados.extend({'indice': indice, 'id': id} for (indice, _), id in zip(validos, ids))
+
+    return sorted(resultados, key=lambda resultado: resultado['indice']), [valores for _, valores in validos]
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 500
+
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado ou de outra ordenação"""
+
+
+def parametros_paginacao():
+    """Lê limit e cursor da query string, aplicando o limite máximo"""
+    limite = request.args.get('limit', LIMITE_PADRAO, type=int)
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    return limite, request.args.get('cursor')
+
+
+def _codificar(valores):
+    """Serializa os valores da chave de ordenação em um cursor opaco"""
+    valores = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+def _decodificar(cursor, ordem):
+    """Converte o cursor de volta para os tipos das colunas de ordenação"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise CursorInvalido('Cursor inválido')
+
+    if not isinstance(valores, list) or len(valores) != len(ordem):
+        raise CursorInvalido('Cursor inválido')
+
+    convertidos = []
+    for coluna, valor in zip(ordem, valores):
+        tipo = coluna.type.python_type
+        try:
+            if tipo is datetime:
+                valor = datetime.fromisoformat(valor)
+            elif tipo is date:
+                valor = date.fromisoformat(valor)
+            else:
+                valor = tipo(valor)
+        except (ValueError, TypeError):
+            raise CursorInvalido('Cursor inválido')
+        convertidos.append(valor)
+    return convertidos
+
+
+def _apos(ordem, valores, descendente):
+    """Predicado de keyset: linhas estritamente após `valores` na ordenação"""
+    condicoes = []
+    for i, coluna in enumerate(ordem):
+        anteriores = [ordem[j] == valores[j] for j in range(i)]
+        comparacao = coluna < valores[i] if descendente else coluna > valores[i]
+        condicoes.append(and_(*anteriores, comparacao))
+    return or_(*condicoes)
+
+
+def paginar(query, ordem, limite, cursor=None, descendente=False):
+    """Aplica paginação por keyset à query.
+
+    `ordem` é a chave de ordenação estável, terminando em uma coluna única
+    (normalmente o id). Retorna (itens, next_cursor); next_cursor é None na
+    última página.
+    """
+    if cursor:
+        query = query.filter(_apos(ordem, _decodificar(cursor, ordem), descendente))
+
+    query = query.order_by(*[coluna.desc() if descendente else coluna.asc() for coluna in ordem])
+    itens = query.limit(limite + 1).all()
+
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = _codificar([getattr(itens[-1], coluna.key) for coluna in ordem])
+
+    return itens, proximo_cursor
@@ -0,0 +1,72 @@
+import os
+import time
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt
+from src.models.database import db
+from src.models.usuario import Usuario
+
+# Por quanto tempo (segundos) o estado do usuário é reaproveitado antes de
+# ser relido do banco; limita o atraso de desativações e mudanças de nível
+TTL_ESTADO_USUARIO = int(os.getenv('JWT_ESTADO_USUARIO_TTL', '30'))
+
+_estado_usuarios = {}
+
+
+def claims_usuario(usuario):
+    """Claims adicionais do token de acesso: nível de acesso e situação"""
+    return {
+        'nivel_acesso': usuario.nivel_acesso,
+        'ativo': bool(usuario.ativo)
+    }
+
+
+def _estado_atual(usuario_id):
+    """(nivel_acesso, ativo) do usuário, com cache local de curta duração"""
+    agora = time.monotonic()
+    em_cache = _estado_usuarios.get(usuario_id)
+    if em_cache and em_cache[0] > agora:
+        return em_cache[1]
+
+    estado = db.session.query(Usuario.nivel_acesso, Usuario.ativo).filter(Usuario.id == usuario_id).first()
+    estado = tuple(estado) if estado else None
+    _estado_usuarios[usuario_id] = (agora + TTL_ESTADO_USUARIO, estado)
+    return estado
+
+
+def token_revogado(jwt_header, jwt_payload):
+    """Considera revogado o token de usuário desativado ou com nível alterado.
+
+    Registrado em main.py como token_in_blocklist_loader; tokens emitidos
+    sem as claims de nível também são recusados.
+    """
+    if 'nivel_acesso' not in jwt_payload:
+        return True
+
+    estado = _estado_atual(int(jwt_payload['sub']))
+    if estado is None:
+        return True
+
+    nivel_acesso, ativo = estado
+    return not ativo or nivel_acesso != jwt_payload['nivel_acesso']
+
+
+def permissao_requerida(autorizado):
+    """Cria um decorador que autoriza a partir das claims do token.
+
+    `autorizado` recebe o nivel_acesso e decide se a requisição pode seguir.
+    Deve ser aplicado abaixo de @jwt_required().
+    """
+    def decorador(funcao):
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            claims = get_jwt()
+            if not claims.get('ativo') or not autorizado(claims.get('nivel_acesso')):
+                return jsonify({'error': 'Acesso negado'}), 403
+            return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+somente_administrador = permissao_requerida(lambda nivel: nivel == 'administrador')
+escrita_permitida = permissao_requerida(lambda nivel: nivel != 'visualizador')
@@ -0,0 +1,93 @@
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import func
+from src.models.database import db
+from src.models.secretaria import Secretaria
+from src.services.relatorios import relatorio_secretarias
+
+# Processos que calculam e serializam os blocos do relatório de secretarias.
+# O pool é de cada worker do gunicorn e cada processo carrega a aplicação
+# inteira: o padrão é pequeno e fixo (no host, workers x RELATORIO_PROCESSOS)
+PROCESSOS = int(os.getenv('RELATORIO_PROCESSOS', '2'))
+# Secretarias por bloco e, a partir de quantas secretarias ativas, o modo
+# paralelo é usado automaticamente
+TAMANHO_BLOCO = int(os.getenv('RELATORIO_BLOCO_SECRETARIAS', '250'))
+MINIMO_PARALELO = int(os.getenv('RELATORIO_PARALELO_MINIMO', '1000'))
+
+_pool = None
+_app = None
+
+
+def _iniciar_processo():
+    """Carrega a aplicação uma vez em cada processo do pool"""
+    global _app
+    from src.main import app
+    _app = app
+
+
+def _calcular_bloco(intervalo_ids, data_inicio, data_fim, incluir_projetos):
+    """Relatório de um bloco, já serializado (itens JSON sem os colchetes)"""
+    with _app.app_context():
+        relatorio = relatorio_secretarias(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            incluir_projetos=incluir_projetos,
+            intervalo_ids=intervalo_ids
+        )
+    return json.dumps(relatorio, sort_keys=True, separators=(',', ':'))[1:-1]
+
+
+def _pool_processos():
+    # spawn: o processo filho não herda conexões nem threads do worker
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PROCESSOS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_iniciar_processo
+        )
+    return _pool
+
+
+def blocos_secretarias():
+    """Intervalos (primeiro id, último id) das secretarias ativas, TAMANHO_BLOCO por bloco"""
+    ids = [id for (id,) in db.session.query(Secretaria.id).filter(Secretaria.ativa == True).order_by(Secretaria.id)]
+    return [
+        (ids[inicio], ids[min(inicio + TAMANHO_BLOCO, len(ids)) - 1])
+        for inicio in range(0, len(ids), TAMANHO_BLOCO)
+    ]
+
+
+def usar_modo_paralelo():
+    """Se o relatório completo vale o modo paralelo (decidido por um COUNT, sem carregar os ids)"""
+    if PROCESSOS <= 1:
+        return False
+    ativas = db.session.query(func.count(Secretaria.id)).filter(Secretaria.ativa == True).scalar()
+    return ativas > TAMANHO_BLOCO and ativas >= MINIMO_PARALELO
+
+
+def partes_relatorio(blocos, data_inicio=None, data_fim=None, incluir_projetos=False):
+    """Gera os trechos JSON dos blocos na ordem dos ids, à medida que ficam prontos.
+
+    No máximo 2 x PROCESSOS blocos ficam em andamento, para que a memória
+    do worker não cresça com o tamanho da instalação.
+    """
+    pool = _pool_processos()
+    pendentes = deque()
+    blocos = iter(blocos)
+
+    for intervalo in blocos:
+        pendentes.append(pool.submit(_calcular_bloco, intervalo, data_inicio, data_fim, incluir_projetos))
+        if len(pendentes) >= 2 * PROCESSOS:
+            break
+
+    while pendentes:
+        parte = pendentes.popleft().result()
+        proximo = next(blocos, None)
+        if proximo is not None:
+            pendentes.append(pool.submit(_calcular_bloco, proximo, data_inicio, data_fim, incluir_projetos))
+        if parte:
+            yield parte
@@ -0,0 +1,356 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import func, case, and_
+from src.models.database import db
+from src.models.replica import leituras_na_replica, escrita_recente, METODOS_LEITURA
+from src.models.secretaria import Secretaria
+from src.models.projeto import Projeto
+from src.models.recursos import ContaPaga, MaterialEscritorio, RecursoEstrategico
+from src.models.serializacao import serializador
+
+# Threads para as seções do relatório de governo (compartilhadas entre requisições)
+SECOES_WORKERS = int(os.getenv('RELATORIO_SECOES_WORKERS', '6'))
+_executor_secoes = (
+    ThreadPoolExecutor(max_workers=SECOES_WORKERS, thread_name_prefix='relatorio-secao')
+    if SECOES_WORKERS > 1 else None
+)
+
+
+def _contar(condicao):
+    """Contagem condicional (SUM de CASE) para uso em agregações"""
+    return func.sum(case((condicao, 1), else_=0))
+
+
+def _somar(condicao, coluna):
+    """Soma condicional de uma coluna numérica"""
+    return func.sum(case((condicao, func.coalesce(coluna, 0)), else_=0))
+
+
+def _filtros_periodo(data_inicio=None, data_fim=None):
+    """Condições de período aplicadas sobre Projeto.data_inicio"""
+    filtros = []
+    if data_inicio:
+        filtros.append(Projeto.data_inicio >= data_inicio)
+    if data_fim:
+        filtros.append(Projeto.data_inicio <= data_fim)
+    return filtros
+
+
+def relatorio_secretarias(data_inicio=None, data_fim=None, secretaria_id=None, incluir_projetos=False,
+                          intervalo_ids=None):
+    """Monta o relatório de secretarias com uma única consulta.
+
+    Sem filtro de período, as estatísticas vêm dos contadores mantidos em
+    secretarias; com período, de um GROUP BY com contagens condicionais.
+    Os projetos só são carregados (em uma consulta) quando pedidos.
+    `intervalo_ids` (primeiro, último) restringe o relatório a um bloco de
+    secretarias, usado pela execução paralela.
+    """
+    filtros_periodo = _filtros_periodo(data_inicio, data_fim)
+    serializar_secretaria = serializador(Secretaria)
+
+    if filtros_periodo:
+        no_periodo = and_(Projeto.id.isnot(None), *filtros_periodo)
+        consulta = db.session.query(
+            *serializar_secretaria.colunas,
+            _contar(no_periodo).label('est_total'),
+            _contar(and_(no_periodo, Projeto.status == 'concluido')).label('est_concluidos'),
+            _contar(and_(no_periodo, Projeto.status == 'execucao')).label('est_em_execucao'),
+            _contar(and_(no_periodo, Projeto.status == 'atrasado')).label('est_atrasados'),
+            _somar(no_periodo, Projeto.recursos_aplicados).label('est_recursos_aplicados'),
+            _somar(no_periodo, Projeto.recursos_pendentes).label('est_recursos_pendentes'),
+            _somar(no_periodo, Projeto.progresso).label('est_progresso_total')
+        ).outerjoin(
+            Projeto, Projeto.secretaria_id == Secretaria.id
+        ).group_by(Secretaria.id)
+    else:
+        consulta = db.session.query(
+            *serializar_secretaria.colunas,
+            Secretaria.total_projetos.label('est_total'),
+            Secretaria.projetos_concluidos.label('est_concluidos'),
+            Secretaria.projetos_em_execucao.label('est_em_execucao'),
+            Secretaria.projetos_atrasados.label('est_atrasados'),
+            Secretaria.recursos_aplicados_total.label('est_recursos_aplicados'),
+            Secretaria.recursos_pendentes_total.label('est_recursos_pendentes'),
+            Secretaria.progresso_total.label('est_progresso_total')
+        )
+
+    consulta = consulta.filter(Secretaria.ativa == True)
+
+    if secretaria_id:
+        consulta = consulta.filter(Secretaria.id == secretaria_id)
+
+    if intervalo_ids:
+        consulta = consulta.filter(Secretaria.id.between(*intervalo_ids))
+
+    linhas = consulta.order_by(Secretaria.id).all()
+
+    projetos_por_secretaria = {}
+    if incluir_projetos and linhas:
+        serializar = serializador(Projeto)
+        projetos_query = db.session.query(*serializar.colunas).join(
+            Secretaria, Projeto.secretaria_id == Secretaria.id
+        ).filter(
+            Secretaria.ativa == True,
+            *filtros_periodo
+        )
+        if secretaria_id:
+            projetos_query = projetos_query.filter(Projeto.secretaria_id == secretaria_id)
+        if intervalo_ids:
+            projetos_query = projetos_query.filter(Projeto.secretaria_id.between(*intervalo_ids))
+
+        for projeto in projetos_query.order_by(Projeto.secretaria_id, Projeto.id):
+            projetos_por_secretaria.setdefault(projeto.secretaria_id, []).append(serializar.de_linha(projeto))
+
+    relatorio = []
+
+    for linha in linhas:
+        total = int(linha.est_total or 0)
+        item = {
+            'secretaria': serializar_secretaria.de_linha(linha),
+            'estatisticas': {
+                'total_projetos': total,
+                'projetos_concluidos': int(linha.est_concluidos or 0),
+                'projetos_em_execucao': int(linha.est_em_execucao or 0),
+                'projetos_atrasados': int(linha.est_atrasados or 0),
+                'recursos_aplicados': float(linha.est_recursos_aplicados or 0),
+                'recursos_pendentes': float(linha.est_recursos_pendentes or 0),
+                'progresso_medio': round(float(linha.est_progresso_total or 0) / total, 2) if total > 0 else 0
+            }
+        }
+
+        if incluir_projetos:
+            item['projetos'] = projetos_por_secretaria.get(linha.id, [])
+
+        relatorio.append(item)
+
+    return relatorio
+
+
+def _filtro_intervalo(coluna, data_inicio=None, data_fim=None):
+    """Filtro por intervalo fechado, aplicado apenas com as duas datas"""
+    if data_inicio and data_fim:
+        return [coluna >= data_inicio, coluna <= data_fim]
+    return []
+
+
+def _detalhes(modelo, filtros, limite=None, pagina=1):
+    """Lista serializada de registros, opcionalmente paginada"""
+    serializar = serializador(modelo)
+    query = db.session.query(*serializar.colunas).filter(*filtros).order_by(modelo.id)
+    if limite:
+        query = query.limit(limite).offset((pagina - 1) * limite)
+    return [serializar.de_linha(registro) for registro in query]
+
+
+def _secao_gastos(filtros, incluir_detalhes, limite, pagina):
+    """Gastos com contas pagas: total, total por tipo e detalhes"""
+    por_tipo = {
+        tipo: float(total or 0)
+        for tipo, total in db.session.query(
+            ContaPaga.tipo_conta,
+            func.sum(ContaPaga.valor)
+        ).filter(*filtros).group_by(ContaPaga.tipo_conta)
+    }
+    secao = {
+        'total': sum(por_tipo.values()),
+        'por_tipo': por_tipo
+    }
+    if incluir_detalhes:
+        secao['detalhes'] = _detalhes(ContaPaga, filtros, limite, pagina)
+    return secao
+
+
+def _secao_materiais(filtros, incluir_detalhes, limite, pagina):
+    """Materiais de escritório: quantidade de registros, valor total e detalhes"""
+    total_itens, valor_total = db.session.query(
+        func.count(MaterialEscritorio.id),
+        func.sum(func.coalesce(MaterialEscritorio.valor_unitario, 0) * MaterialEscritorio.quantidade)
+    ).filter(*filtros).one()
+    secao = {
+        'total_itens': total_itens,
+        'valor_total': float(valor_total or 0)
+    }
+    if incluir_detalhes:
+        secao['detalhes'] = _detalhes(MaterialEscritorio, filtros, limite, pagina)
+    return secao
+
+
+def _secao_recursos(filtros, incluir_detalhes, limite, pagina):
+    """Recursos estratégicos: quantidade de registros, valor total e detalhes"""
+    total_itens, valor_total = db.session.query(
+        func.count(RecursoEstrategico.id),
+        func.sum(func.coalesce(RecursoEstrategico.valor, 0))
+    ).filter(*filtros).one()
+    secao = {
+        'total_itens': total_itens,
+        'valor_total': float(valor_total or 0)
+    }
+    if incluir_detalhes:
+        secao['detalhes'] = _detalhes(RecursoEstrategico, filtros, limite, pagina)
+    return secao
+
+
+def _em_contexto_proprio(app, leitura_replica, funcao, args):
+    """Executa a seção em um app context próprio (sessão e conexão próprias)"""
+    with app.app_context():
+        if leitura_replica:
+            leituras_na_replica()
+        return funcao(*args)
+
+
+def _executar_secoes(secoes):
+    """Executa as seções [(funcao, args), ...] em paralelo e devolve os resultados na ordem.
+
+    Cada seção usa uma conexão do pool; a latência fica próxima à da seção
+    mais lenta. Com RELATORIO_SECOES_WORKERS=1 as seções rodam em sequência.
+    Antes de distribuir as seções a requisição encerra a própria transação e
+    devolve sua conexão ao pool: segurá-la enquanto espera as seções esgota
+    o pool com poucas requisições concorrentes. O pool de cada processo
+    (DB_POOL_SIZE + DB_MAX_OVERFLOW) deve comportar as seções em andamento,
+    até RELATORIO_SECOES_WORKERS, além das conexões das demais requisições.
+    """
+    if _executor_secoes is None:
+        return [funcao(*args) for funcao, args in secoes]
+
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    # As seções herdam o roteamento para a réplica da requisição de leitura
+    leitura_replica = bool(g.get('leituras_na_replica')) or (
+        has_request_context() and request.method in METODOS_LEITURA and not escrita_recente()
+    )
+    futuros = [
+        _executor_secoes.submit(_em_contexto_proprio, app, leitura_replica, funcao, args)
+        for funcao, args in secoes
+    ]
+    return [futuro.result() for futuro in futuros]
+
+
+def relatorio_governo(data_inicio=None, data_fim=None, incluir_detalhes=True, limite=None, pagina=1):
+    """Monta o relatório da Secretaria de Governo.
+
+    As três seções são independentes e consultadas em paralelo. Os totais
+    vêm de consultas agregadas (GROUP BY/SUM); os registros em 'detalhes'
+    podem ser omitidos ou paginados com limite/pagina.
+    """
+    opcoes = (incluir_detalhes, limite, pagina)
+    gastos, materiais, recursos_estrategicos = _executar_secoes([
+        (_secao_gastos, (_filtro_intervalo(ContaPaga.data_pagamento, data_inicio, data_fim), *opcoes)),
+        (_secao_materiais, (_filtro_intervalo(MaterialEscritorio.data_entrada, data_inicio, data_fim), *opcoes)),
+        (_secao_recursos, (_filtro_intervalo(RecursoEstrategico.data_chegada, data_inicio, data_fim), *opcoes)),
+    ])
+
+    resumo = {
+        'gastos': gastos,
+        'materiais': materiais,
+        'recursos_estrategicos': recursos_estrategicos
+    }
+
+    if incluir_detalhes and limite:
+        resumo['paginacao_detalhes'] = {'pagina': pagina, 'limite': limite}
+
+    return resumo
+
+
+# Tabelas das quais cada relatório depende (usadas para versionar resultados)
+TABELAS_RELATORIO = {
+    'secretarias': (Secretaria, Projeto),
+    'governo': (ContaPaga, MaterialEscritorio, RecursoEstrategico)
+}
+
+
+def converter_data(valor):
+    """Converte uma data YYYY-MM-DD opcional"""
+    return datetime.strptime(valor, '%Y-%m-%d').date() if valor else None
+
+
+def _inteiro(valor, campo):
+    """Inteiro opcional vindo da query string ou do JSON de um job"""
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, bool):
+        raise ValueError(f'{campo} deve ser um número inteiro')
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} deve ser um número inteiro')
+
+
+def converter_limite(valor):
+    """Converte o limite opcional de itens por página de detalhes (inteiro >= 1)"""
+    limite = _inteiro(valor, 'limite')
+    if limite is not None and limite < 1:
+        raise ValueError('limite deve ser maior que zero')
+    return limite
+
+
+def converter_booleano(valor, padrao=False):
+    """Converte um parâmetro true/false (texto da query string ou booleano JSON)"""
+    if valor is None:
+        return padrao
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).lower() in ('1', 'true', 'sim')
+
+
+def normalizar_parametros(tipo, parametros):
+    """Valida os parâmetros de um relatório com as regras dos endpoints síncronos.
+
+    Devolve os parâmetros convertidos (apenas tipos JSON, para gravar no job)
+    ou levanta ValueError, de modo que um job inválido é recusado ao ser criado.
+    """
+    if tipo not in TABELAS_RELATORIO:
+        raise ValueError(f'Tipo de relatório inválido: {tipo}')
+
+    normalizados = {}
+    for campo in ('periodo_inicio', 'periodo_fim'):
+        valor = parametros.get(campo)
+        try:
+            converter_data(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f'{campo} deve estar no formato YYYY-MM-DD')
+        normalizados[campo] = valor or None
+
+    if tipo == 'secretarias':
+        normalizados['secretaria_id'] = _inteiro(parametros.get('secretaria_id'), 'secretaria_id')
+        normalizados['incluir_projetos'] = converter_booleano(parametros.get('incluir_projetos'))
+    else:
+        normalizados['incluir_detalhes'] = converter_booleano(parametros.get('incluir_detalhes'), True)
+        normalizados['limite'] = converter_limite(parametros.get('limite'))
+        normalizados['pagina'] = max(1, _inteiro(parametros.get('pagina'), 'pagina') or 1)
+    return normalizados
+
+
+def gerar_relatorio(tipo, parametros):
+    """Gera o payload completo de um relatório a partir de parâmetros simples.
+
+    Usado fora do ciclo de requisição (jobs); aceita as mesmas chaves da
+    query string dos endpoints síncronos.
+    """
+    parametros = normalizar_parametros(tipo, parametros)
+    periodo_inicio = parametros['periodo_inicio']
+    periodo_fim = parametros['periodo_fim']
+    periodo = {'inicio': periodo_inicio, 'fim': periodo_fim}
+    data_inicio, data_fim = converter_data(periodo_inicio), converter_data(periodo_fim)
+
+    if tipo == 'secretarias':
+        relatorio = relatorio_secretarias(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            secretaria_id=parametros['secretaria_id'],
+            incluir_projetos=parametros['incluir_projetos']
+        )
+        return {'relatorio': relatorio, 'periodo': periodo}
+
+    resumo = relatorio_governo(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        incluir_detalhes=parametros['incluir_detalhes'],
+        limite=parametros['limite'],
+        pagina=parametros['pagina']
+    )
+    resumo['periodo'] = periodo
+    return {'relatorio': resumo}
@@ -0,0 +1,64 @@
+import json
+from datetime import date, datetime
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from src.models.database import db
+from src.models.snapshot import DashboardSnapshot
+
+
+def obter_snapshot(chave, gerar):
+    """Retorna o payload do snapshot `chave`, gerando-o com `gerar()` se preciso.
+
+    O snapshot é válido enquanto nenhuma escrita o invalidou (versao ==
+    versao_gerada) e ainda é do mesmo dia, já que os dashboards dependem da
+    data atual. A gravação só acontece se a versão não mudou durante o
+    cálculo, para não fixar um payload já desatualizado.
+    """
+    snapshot = db.session.get(DashboardSnapshot, chave)
+
+    if snapshot is None:
+        # Registro criado antes do cálculo para que escritas concorrentes o invalidem
+        try:
+            db.session.add(DashboardSnapshot(chave=chave, versao=0))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+        snapshot = db.session.get(DashboardSnapshot, chave)
+
+    hoje = date.today()
+    if (snapshot.payload is not None
+            and snapshot.versao_gerada == snapshot.versao
+            and snapshot.data_referencia == hoje):
+        return json.loads(snapshot.payload)
+
+    versao = snapshot.versao
+    payload = gerar()
+
+    # Encerra a transação de leitura antes de gravar: no SQLite em WAL,
+    # promover uma leitura a escrita falha sem esperar pelo busy_timeout
+    db.session.commit()
+
+    db.session.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.chave == chave, DashboardSnapshot.versao == versao)
+        .values(
+            payload=json.dumps(payload),
+            versao_gerada=versao,
+            data_referencia=hoje,
+            gerado_em=datetime.utcnow()
+        )
+    )
+    db.session.commit()
+
+    return payload
+
+
+def invalidar_snapshots():
+    """Marca todos os snapshots como desatualizados.
+
+    Deve ser chamada antes do commit da escrita, para que a invalidação
+    faça parte da mesma transação.
+    """
+    db.session.execute(
+        update(DashboardSnapshot).values(versao=DashboardSnapshot.versao + 1)
+    )
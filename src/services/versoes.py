@@ -0,0 +1,31 @@
+import hashlib
+from flask import g, has_request_context
+from src.models.database import db
+from src.models.versoes_tabelas import VersaoTabela
+
+
+def versao_tabelas(*modelos):
+    """Marcador de versão das tabelas dos modelos informados.
+
+    Lê os contadores de versoes_tabelas, incrementados na mesma transação
+    de cada escrita (ver src/models/versoes_tabelas.py): uma consulta pela
+    chave primária, sem varrer as tabelas. Retorna um hash curto que muda
+    quando os dados mudam. Dentro de uma requisição o resultado é
+    reaproveitado (ETag e cache de consultas leem a mesma versão).
+    """
+    memo = g.setdefault('versoes_tabelas', {}) if has_request_context() else {}
+    chave = tuple(sorted(modelo.__tablename__ for modelo in modelos))
+    if chave in memo:
+        return memo[chave]
+
+    versoes = {
+        tabela: f'{versao}:{criado_em}'
+        for tabela, versao, criado_em in db.session.query(
+            VersaoTabela.tabela, VersaoTabela.versao, VersaoTabela.criado_em
+        ).filter(VersaoTabela.tabela.in_(chave))
+    }
+
+    # Tabela ainda sem escritas registradas: versão 0
+    marcador = '|'.join(f'{tabela}:{versoes.get(tabela, 0)}' for tabela in chave)
+    memo[chave] = hashlib.sha1(marcador.encode()).hexdigest()[:16]
+    return memo[chave]
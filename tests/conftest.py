@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Banco, cache e jobs isolados em um diretório temporário, antes de importar a aplicação
+_DIRETORIO = tempfile.mkdtemp(prefix='site-testes-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRETORIO, 'app.db')}"
+os.environ['CACHE_CONSULTAS_ARQUIVO'] = os.path.join(_DIRETORIO, 'cache_consultas.db')
+os.environ['RELATORIO_JOBS_DIR'] = os.path.join(_DIRETORIO, 'relatorios')
+os.environ['CACHE_CONSULTAS_TTL'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app as aplicacao  # noqa: E402
+from src.models.database import db  # noqa: E402
+from src.models.usuario import Usuario  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """Aplicação com o banco recriado a cada teste"""
+    with aplicacao.app_context():
+        db.drop_all()
+        db.create_all()
+        yield aplicacao
+        db.session.remove()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def autenticacao(app, cliente):
+    """Cabeçalho Authorization de um administrador"""
+    usuario = Usuario(nome='Admin', email='admin@teste.gov.br', nivel_acesso='admin')
+    usuario.set_senha('admin123')
+    db.session.add(usuario)
+    db.session.commit()
+
+    resposta = cliente.post('/api/auth/login', json={'email': 'admin@teste.gov.br', 'senha': 'admin123'})
+    return {'Authorization': f"Bearer {resposta.get_json()['access_token']}"}
@@ -0,0 +1,20 @@
+from src.services import cache_consultas
+
+
+def test_acerto_no_cache_nao_grava_a_cada_leitura(app, monkeypatch):
+    cache_consultas.limpar_cache()
+    comandos = []
+    conexao = cache_consultas._conexao()
+    conexao.set_trace_callback(comandos.append)
+    try:
+        cache_consultas._gravar('chave', {'valor': 1}, 60)
+        comandos.clear()
+        assert [cache_consultas._ler('chave') for _ in range(3)] == [{'valor': 1}] * 3
+
+        monkeypatch.setattr(cache_consultas, 'INTERVALO_ACESSO', -1)
+        cache_consultas._ler('chave')
+    finally:
+        conexao.set_trace_callback(None)
+
+    atualizacoes = [comando for comando in comandos if comando.startswith('UPDATE')]
+    assert len(atualizacoes) == 1
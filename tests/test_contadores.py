@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from src.models.contadores import reconciliar_contadores
+from src.models.database import db
+from src.models.projeto import Projeto
+from src.models.secretaria import Secretaria
+
+
+def _secretaria():
+    secretaria = Secretaria(nome='Secretaria de Obras', responsavel='Ana Costa')
+    db.session.add(secretaria)
+    db.session.commit()
+    return secretaria
+
+
+def _contadores(secretaria_id):
+    db.session.expire_all()
+    secretaria = db.session.get(Secretaria, secretaria_id)
+    return {
+        'total': secretaria.total_projetos,
+        'planejamento': secretaria.projetos_planejamento,
+        'concluidos': secretaria.projetos_concluidos,
+        'aplicados': Decimal(secretaria.recursos_aplicados_total),
+        'progresso': secretaria.progresso_total
+    }
+
+
+def test_atualizacao_de_projeto_expirado_apos_commit(app):
+    secretaria = _secretaria()
+    projeto = Projeto(titulo='Ponte', secretaria_id=secretaria.id, status='planejamento',
+                      progresso=10, recursos_aplicados=100)
+    db.session.add(projeto)
+    db.session.commit()  # expira os atributos do projeto
+
+    projeto.status = 'concluido'
+    projeto.progresso = 100
+    projeto.recursos_aplicados = 250
+    db.session.commit()
+
+    assert _contadores(secretaria.id) == {
+        'total': 1, 'planejamento': 0, 'concluidos': 1,
+        'aplicados': Decimal('250'), 'progresso': 100
+    }
+    assert reconciliar_contadores() == 0
+
+
+def test_troca_de_secretaria_de_projeto_expirado(app):
+    origem, destino = _secretaria(), _secretaria()
+    projeto = Projeto(titulo='Escola', secretaria_id=origem.id, recursos_aplicados=40)
+    db.session.add(projeto)
+    db.session.commit()
+
+    projeto.secretaria_id = destino.id
+    db.session.commit()
+
+    assert _contadores(origem.id)['total'] == 0
+    assert _contadores(destino.id)['total'] == 1
+    assert _contadores(destino.id)['aplicados'] == Decimal('40')
+    assert reconciliar_contadores() == 0
@@ -0,0 +1,47 @@
+import json
+
+from src.models.database import db
+from src.models.recursos import MaterialEscritorio
+
+CABECALHO = 'nome;quantidade;data_entrada\n'
+
+
+def _importar(cliente, autenticacao, conteudo):
+    return cliente.post(
+        '/api/recursos/importar/materiais', headers={**autenticacao, 'Content-Type': 'text/csv'}, data=conteudo
+    )
+
+
+def _eventos(resposta):
+    return [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+
+
+def test_importacao_de_csv(app, cliente, autenticacao):
+    conteudo = CABECALHO + ''.join(f'Caneta {i};{i + 1};2025-01-02\n' for i in range(10)) + 'Lápis;x;2025-01-02\n'
+    resposta = _importar(cliente, autenticacao, conteudo.encode())
+
+    eventos = _eventos(resposta)
+    assert resposta.status_code == 200
+    assert eventos[0] == {'tipo': 'erro', 'linha': 12, 'erro': 'quantidade deve ser numérico'}
+    assert eventos[-1] == {'tipo': 'fim', 'linhas': 11, 'inseridos': 10, 'erros': 1}
+    assert db.session.query(MaterialEscritorio).count() == 10
+
+
+def test_arquivo_fora_do_utf8_encerra_o_fluxo_com_erro_e_totais(app, cliente, autenticacao):
+    # O trecho inválido fica além do primeiro bloco decodificado (o cabeçalho é lido à parte)
+    validas = ''.join(f'Caneta azul número {i};{i + 1};2025-01-02\n' for i in range(1000))
+    conteudo = (CABECALHO + validas).encode() + 'Café;1;2025-01-02\n'.encode('latin-1')
+    resposta = _importar(cliente, autenticacao, conteudo)
+
+    eventos = _eventos(resposta)
+    assert resposta.status_code == 200
+    erro = next(evento for evento in eventos if evento['tipo'] == 'erro')
+    assert erro['erro'].startswith('Leitura do arquivo interrompida')
+    assert eventos[-1]['tipo'] == 'fim'
+    assert eventos[-1]['erros'] == 1
+    assert eventos[-1]['inseridos'] == db.session.query(MaterialEscritorio).count() > 0
+
+
+def test_cabecalho_fora_do_utf8(app, cliente, autenticacao):
+    resposta = _importar(cliente, autenticacao, 'descrição;nome;quantidade;data_entrada\n'.encode('latin-1'))
+    assert resposta.status_code == 400
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.services import jobs
+
+
+@pytest.mark.parametrize('parametros', [
+    {'pagina': 'x'},
+    {'limite': 0},
+    {'periodo_inicio': '31/12/2024'},
+])
+def test_job_de_governo_com_parametros_invalidos(cliente, autenticacao, parametros):
+    resposta = cliente.post('/api/relatorios/jobs', headers=autenticacao,
+                            json={'tipo': 'governo', 'parametros': parametros})
+    assert resposta.status_code == 400
+
+
+def test_job_de_secretarias_com_id_invalido(cliente, autenticacao):
+    resposta = cliente.post('/api/relatorios/jobs', headers=autenticacao,
+                            json={'tipo': 'secretarias', 'parametros': {'secretaria_id': 'abc'}})
+    assert resposta.status_code == 400
+    assert resposta.get_json()['error'] == 'secretaria_id deve ser um número inteiro'
+
+
+def test_job_parado_alem_do_tempo_maximo_vira_erro(app):
+    criado_em = (datetime.utcnow() - timedelta(seconds=jobs.TEMPO_MAXIMO_SEGUNDOS + 60)).isoformat()
+    job = {'id': 'parado', 'tipo': 'governo', 'parametros': {}, 'chave': 'x', 'status': 'executando',
+           'criado_em': criado_em, 'iniciado_em': criado_em, 'concluido_em': None, 'erro': None}
+    jobs._atualizar_job(job)
+
+    assert jobs.obter_job('parado')['status'] == 'erro'
+    assert jobs.obter_job('parado')['erro'].startswith('Job interrompido')
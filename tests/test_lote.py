@@ -0,0 +1,39 @@
+from sqlalchemy import event
+
+from src.models.contadores import reconciliar_contadores
+from src.models.database import db
+from src.models.projeto import Projeto
+from src.models.secretaria import Secretaria
+
+
+def test_lote_de_projetos_em_um_unico_insert(app, cliente, autenticacao):
+    secretarias = [Secretaria(nome=f'Secretaria {i}', responsavel='Ana Costa') for i in range(2)]
+    db.session.add_all(secretarias)
+    db.session.commit()
+    ids_secretarias = [secretaria.id for secretaria in secretarias]
+
+    inserts = []
+
+    def registrar(conexao, cursor, sql, *args):
+        if sql.startswith('INSERT INTO projetos'):
+            inserts.append(sql)
+
+    itens = [
+        {'titulo': f'Projeto {i}', 'secretaria_id': ids_secretarias[i % 2], 'status': 'execucao',
+         'recursos_aplicados': 10}
+        for i in range(50)
+    ]
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        resposta = cliente.post('/api/projetos/lote', headers=autenticacao, json=itens)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    assert resposta.status_code == 201
+    assert len(inserts) == 1
+    for resultado in resposta.get_json()['resultados']:
+        assert db.session.get(Projeto, resultado['id']).titulo == f"Projeto {resultado['indice']}"
+
+    db.session.expire_all()
+    assert [db.session.get(Secretaria, id).projetos_em_execucao for id in ids_secretarias] == [25, 25]
+    assert reconciliar_contadores() == 0